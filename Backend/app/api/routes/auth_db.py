@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import timedelta
 
 from app.core.database import get_db
 from app.models.database_models import User, UserRole, AuthProvider
-from app.core.auth_utils import verify_password, get_password_hash, create_access_token
-from app.core.firebase import verify_firebase_token
+from app.core.auth_utils import verify_password_async, get_password_hash_async, create_access_token
+from app.core.firebase import verify_firebase_token_async
 from app.core.security_db import get_current_user_from_token
+from app.core.rate_limit import rate_limiter, limit_by_ip
 from app.core.config import settings
 
 router = APIRouter()
@@ -43,12 +45,12 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+@router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_by_ip("register:ip"))])
+async def register_user(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """Register new user with email/password"""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,7 +58,7 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         display_name=user_data.display_name,
@@ -67,8 +69,8 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create access token
     access_token = create_access_token(
@@ -91,12 +93,15 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         }
     }
 
-@router.post("/login", response_model=Token)
-async def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_by_ip("login:ip"))])
+async def login_user(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user with email/password"""
     
+    # Throttle guessing against a single account from many addresses
+    await rate_limiter.check("login:email", credentials.email.lower())
+    
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
     
     if not user:
         raise HTTPException(
@@ -112,7 +117,7 @@ async def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -146,12 +151,12 @@ async def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
         }
     }
 
-@router.post("/google", response_model=Token)
-async def google_auth(auth_data: GoogleAuthRequest, db: Session = Depends(get_db)):
+@router.post("/google", response_model=Token, dependencies=[Depends(limit_by_ip("google:ip"))])
+async def google_auth(auth_data: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """Authenticate user with Google (Firebase token)"""
     
     # Verify Firebase token
-    decoded_token = verify_firebase_token(auth_data.firebase_token)
+    decoded_token = await verify_firebase_token_async(auth_data.firebase_token)
     
     if not decoded_token:
         raise HTTPException(
@@ -164,17 +169,17 @@ async def google_auth(auth_data: GoogleAuthRequest, db: Session = Depends(get_db
     display_name = decoded_token.get("name") or decoded_token.get("email").split("@")[0]
     
     # Check if user exists
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).where(
         (User.firebase_uid == firebase_uid) | (User.email == email)
-    ).first()
+    ))
     
     if user:
         # Update firebase_uid if it's a new link
         if not user.firebase_uid:
             user.firebase_uid = firebase_uid
             user.auth_provider = AuthProvider.GOOGLE
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
     else:
         # Create new user
         user = User(
@@ -186,8 +191,8 @@ async def google_auth(auth_data: GoogleAuthRequest, db: Session = Depends(get_db
             email_verified=decoded_token.get("email_verified", False)
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     
     # Create access token
     access_token = create_access_token(
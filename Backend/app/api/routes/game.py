@@ -1,53 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.core.security_db import get_current_user_from_token
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security_db import get_current_user_from_token, require_teacher
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.database_models import User, GameSession, DifficultyLevel
+from app.core.game_store import save_game_sessions, publish_game_sessions, game_session_writer, get_data_version
+from app.core.leaderboard import leaderboards
+from app.core.puzzle_bank import DIFFICULTY_CONFIGS, get_puzzle_bank
+from app.core.hint_engine import get_hint_engine
+from app.core.fast_json import fast_response
+from app.core.rate_limit import limit_by_user, rate_limiter
+from app.core.idempotency import idempotency_cache
+from app.core.session_export import iter_session_records, stream_ndjson, stream_csv
+from app.models.database_models import User, GameSession, UserGameStats, DifficultyLevel, ClassEnrollment, SubmitIdempotencyKey
 from app.models.game_schemas import (
     GameConfigRequest,
     GameConfigResponse,
+    HintRequest,
+    HintResponse,
     SubmitAnswerRequest,
     SubmitAnswerResponse,
+    BatchSubmitRequest,
+    BatchSubmitResponse,
     GameProgressResponse,
+    LeaderboardWindow,
+    LeaderboardResponse,
+    ExportFormat,
     GameSessionResponse
 )
-import random
-from typing import List
+import base64
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
 
 router = APIRouter()
 
-def generate_game_config(difficulty: DifficultyLevel) -> dict:
-    """Generate game configuration based on difficulty level"""
-    configs = {
-        DifficultyLevel.EASY: {
-            "min_value": 1,
-            "max_value": 10,
-            "target_range": (5, 20),
-            "max_addends": 3,
-            "hints_enabled": True
-        },
-        DifficultyLevel.MEDIUM: {
-            "min_value": 1,
-            "max_value": 20,
-            "target_range": (10, 50),
-            "max_addends": 4,
-            "hints_enabled": True
-        },
-        DifficultyLevel.HARD: {
-            "min_value": 1,
-            "max_value": 50,
-            "target_range": (20, 100),
-            "max_addends": 5,
-            "hints_enabled": False
-        }
-    }
-    
-    config = configs[difficulty]
-    target_number = random.randint(*config["target_range"])
-    
+@lru_cache(maxsize=None)
+def _config_template(difficulty: DifficultyLevel) -> dict:
+    """Static part of the config response for a difficulty level"""
+    config = DIFFICULTY_CONFIGS[difficulty]
     return {
-        "target_number": target_number,
         "difficulty": difficulty,
         "min_value": config["min_value"],
         "max_value": config["max_value"],
@@ -55,6 +50,18 @@ def generate_game_config(difficulty: DifficultyLevel) -> dict:
         "hints_enabled": config["hints_enabled"]
     }
 
+def generate_game_config(difficulty: DifficultyLevel, tier: Optional[int] = None) -> dict:
+    """Generate game configuration based on difficulty level (and optional tier)"""
+    difficulty = DifficultyLevel(difficulty)
+    bank = get_puzzle_bank(difficulty)
+    target_number = bank.sample(tier)
+    
+    return {
+        "target_number": target_number,
+        **_config_template(difficulty),
+        "solution_count": bank.solution_counts[target_number]
+    }
+
 def calculate_score(is_correct: bool, difficulty: DifficultyLevel, time_spent: int = None, attempts: int = 1) -> int:
     """Calculate score based on correctness, difficulty, time, and attempts"""
     if not is_correct:
@@ -77,27 +84,48 @@ def calculate_score(is_correct: bool, difficulty: DifficultyLevel, time_spent: i
     
     return score
 
-@router.post("/config", response_model=GameConfigResponse)
-async def get_game_config(
-    request: GameConfigRequest,
-    current_user: User = Depends(get_current_user_from_token)
-):
+def encode_history_cursor(session: GameSession) -> str:
+    """Opaque keyset cursor pointing just past the given session"""
+    raw = json.dumps([session.created_at.isoformat(), session.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str):
+    """Decode a history cursor into (created_at, id), or raise 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
+def data_version_etag(user_id: int, version: int) -> str:
+    """ETag for responses derived only from one user's game data"""
+    return f'"{user_id}.{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+async def conditional_get(db: AsyncSession, user_id: int, if_none_match: Optional[str], response: Response) -> Optional[Response]:
     """
-    Generate a new game configuration based on difficulty level.
-    Returns target number and game parameters.
+    Check the user's data version before doing any work.
+    Returns a 304 response if the client's copy is current; otherwise sets ETag on `response` and returns None.
     """
-    config = generate_game_config(request.difficulty)
-    return config
+    etag = data_version_etag(user_id, await get_data_version(db, user_id))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
-@router.post("/submit", response_model=SubmitAnswerResponse)
-async def submit_answer(
-    request: SubmitAnswerRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_token)
-):
+def grade_answer(request: SubmitAnswerRequest, user_id: int):
     """
-    Submit an answer for validation and save game session.
-    Returns feedback and score.
+    Grade one answer.
+    Returns the response payload (without session_id) and the game session row to insert.
     """
     user_sum = sum(request.user_answer)
     is_correct = user_sum == request.target_number
@@ -121,81 +149,220 @@ async def submit_answer(
         1  # Default to 1 attempt for now
     )
     
-    # Save game session to database
-    game_session = GameSession(
-        user_id=current_user.id,
-        difficulty=request.difficulty,
-        target_number=request.target_number,
-        user_answer=request.user_answer,
-        is_correct=is_correct,
-        attempts=1,
-        time_spent_seconds=request.time_spent_seconds,
-        score=score
-    )
-    
-    db.add(game_session)
-    db.commit()
-    db.refresh(game_session)
-    
-    return {
+    result = {
         "is_correct": is_correct,
         "user_sum": user_sum,
         "target_number": request.target_number,
         "difference": difference,
         "feedback": feedback,
-        "score": score,
-        "session_id": game_session.id
+        "score": score
     }
+    game_session = {
+        "user_id": user_id,
+        "difficulty": request.difficulty,
+        "target_number": request.target_number,
+        "user_answer": request.user_answer,
+        "is_correct": is_correct,
+        "attempts": 1,
+        "time_spent_seconds": request.time_spent_seconds,
+        "score": score
+    }
+    return result, game_session
+
+@router.post("/config", response_model=GameConfigResponse)
+async def get_game_config(
+    request: GameConfigRequest,
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Generate a new game configuration based on difficulty level.
+    Returns target number and game parameters.
+    """
+    config = generate_game_config(request.difficulty, request.tier)
+    return fast_response(config)
+
+@router.post("/hint", response_model=HintResponse)
+async def get_hint(
+    request: HintRequest,
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Suggest the next step toward balancing the scale from a partial answer.
+    Only available for difficulties with hints enabled.
+    """
+    config = DIFFICULTY_CONFIGS[request.difficulty]
+    if not config["hints_enabled"]:
+        raise HTTPException(status_code=400, detail="Hints are not available for this difficulty")
+    
+    low, high = config["target_range"]
+    if not low <= request.target_number <= high:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Target must be between {low} and {high} for this difficulty"
+        )
+    
+    engine = get_hint_engine(DifficultyLevel(request.difficulty))
+    return engine.hint(request.target_number, request.user_answer)
+
+async def replay_submission(db: AsyncSession, user_id: int, idempotency_key: str) -> dict:
+    """Rebuild the original submit response for an Idempotency-Key already stored in the database"""
+    session_id = await db.scalar(
+        select(SubmitIdempotencyKey.session_id).where(
+            SubmitIdempotencyKey.user_id == user_id,
+            SubmitIdempotencyKey.key == idempotency_key
+        )
+    )
+    game_session = await db.get(GameSession, session_id) if session_id is not None else None
+    if game_session is None:
+        raise HTTPException(status_code=409, detail="This Idempotency-Key was already used")
+    
+    # Grading is deterministic, so re-grading the stored answer reproduces the response
+    result, _ = grade_answer(SubmitAnswerRequest(
+        target_number=game_session.target_number,
+        user_answer=game_session.user_answer,
+        difficulty=game_session.difficulty,
+        time_spent_seconds=game_session.time_spent_seconds
+    ), user_id)
+    result["session_id"] = game_session.id
+    return result
+
+@router.post("/submit", response_model=SubmitAnswerResponse, dependencies=[Depends(limit_by_user("submit:user"))])
+async def submit_answer(
+    request: SubmitAnswerRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_token),
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=64)
+):
+    """
+    Submit an answer for validation and save game session.
+    Returns feedback and score.
+    Retries that repeat an Idempotency-Key header get the original response back.
+    """
+    if idempotency_key:
+        cached = idempotency_cache.get(current_user.id, idempotency_key)
+        if cached is not None:
+            return fast_response(cached)
+    
+    result, game_session = grade_answer(request, current_user.id)
+    
+    # Save game session to database
+    if settings.GAME_SESSION_WRITE_BEHIND and not idempotency_key:
+        # Hand back the connection the auth lookup may hold: the flush needs one
+        # from the same pool, and a burst of waiting requests would exhaust it
+        await db.close()
+        result["session_id"] = await game_session_writer.submit(game_session)
+    else:
+        try:
+            result["session_id"] = (await save_game_sessions(db, [game_session]))[0]
+            if idempotency_key:
+                # Primary key conflict here means another request with this key got there first
+                await db.execute(insert(SubmitIdempotencyKey).values(
+                    user_id=current_user.id,
+                    key=idempotency_key,
+                    session_id=result["session_id"]
+                ))
+            await db.commit()
+        except IntegrityError:
+            if not idempotency_key:
+                raise
+            await db.rollback()
+            result = await replay_submission(db, current_user.id, idempotency_key)
+        else:
+            publish_game_sessions([game_session], [result["session_id"]])
+    
+    if idempotency_key:
+        idempotency_cache.put(current_user.id, idempotency_key, result)
+    return fast_response(result)
+
+@router.post("/submit/batch", response_model=BatchSubmitResponse)
+async def submit_answers_batch(
+    request: BatchSubmitRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Submit several answers at once (e.g. rounds played offline).
+    All sessions are saved with a single bulk insert; results keep request order.
+    Counts as one submit per answer against the submit rate limit.
+    """
+    await rate_limiter.check("submit:user", current_user.id, cost=len(request.answers))
+    
+    graded = [grade_answer(answer, current_user.id) for answer in request.answers]
+    
+    game_sessions = [game_session for _, game_session in graded]
+    session_ids = await save_game_sessions(db, game_sessions)
+    await db.commit()
+    publish_game_sessions(game_sessions, session_ids)
+    
+    results = []
+    for (result, _), session_id in zip(graded, session_ids):
+        result["session_id"] = session_id
+        results.append(result)
+    
+    return {"results": results}
 
 @router.get("/progress", response_model=GameProgressResponse)
 async def get_progress(
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_from_token)
 ):
     """
     Get user's game progress and statistics.
+    Supports If-None-Match with the returned ETag (304 until the next submit).
     """
-    # Get all sessions for the user
-    sessions = db.query(GameSession).filter(
-        GameSession.user_id == current_user.id
-    ).all()
-    
-    if not sessions:
-        return {
-            "total_games": 0,
-            "correct_games": 0,
-            "accuracy_percentage": 0.0,
-            "total_score": 0,
-            "average_time_seconds": 0.0,
-            "difficulty_stats": {
-                "easy": {"played": 0, "correct": 0, "accuracy": 0.0},
-                "medium": {"played": 0, "correct": 0, "accuracy": 0.0},
-                "hard": {"played": 0, "correct": 0, "accuracy": 0.0}
-            },
-            "recent_sessions": []
-        }
+    not_modified = await conditional_get(db, current_user.id, if_none_match, response)
+    if not_modified is not None:
+        return not_modified
     
-    total_games = len(sessions)
-    correct_games = sum(1 for s in sessions if s.is_correct)
-    total_score = sum(s.score for s in sessions)
+    # Per-difficulty totals from the rollup table (primary-key lookup)
+    rows = (await db.scalars(
+        select(UserGameStats).where(UserGameStats.user_id == current_user.id)
+    )).all()
+    by_difficulty = {row.difficulty: row for row in rows}
     
-    # Calculate average time (only for sessions with time data)
-    times = [s.time_spent_seconds for s in sessions if s.time_spent_seconds]
-    average_time = sum(times) / len(times) if times else 0.0
+    total_games = 0
+    correct_games = 0
+    total_score = 0
+    time_sum = 0
+    time_count = 0
     
     # Difficulty stats
     difficulty_stats = {}
-    for difficulty in ["easy", "medium", "hard"]:
-        diff_sessions = [s for s in sessions if s.difficulty.value == difficulty]
-        diff_correct = sum(1 for s in diff_sessions if s.is_correct)
-        difficulty_stats[difficulty] = {
-            "played": len(diff_sessions),
-            "correct": diff_correct,
-            "accuracy": (diff_correct / len(diff_sessions) * 100) if diff_sessions else 0.0
+    for difficulty in DifficultyLevel:
+        row = by_difficulty.get(difficulty)
+        played = row.played if row else 0
+        correct = row.correct if row else 0
+        difficulty_stats[difficulty.value] = {
+            "played": played,
+            "correct": correct,
+            "accuracy": (correct / played * 100) if played else 0.0
         }
+        if row:
+            total_games += played
+            correct_games += correct
+            total_score += row.total_score
+            time_sum += row.time_sum
+            time_count += row.time_count
+    
+    # Calculate average time (only for sessions with time data)
+    average_time = time_sum / time_count if time_count else 0.0
     
     # Recent sessions (last 5)
-    recent = sorted(sessions, key=lambda x: x.created_at, reverse=True)[:5]
+    recent = (await db.execute(
+        select(
+            GameSession.id,
+            GameSession.difficulty,
+            GameSession.target_number,
+            GameSession.is_correct,
+            GameSession.score,
+            GameSession.created_at
+        )
+        .where(GameSession.user_id == current_user.id)
+        .order_by(GameSession.created_at.desc())
+        .limit(5)
+    )).all()
     recent_sessions = [
         {
             "id": s.id,
@@ -208,7 +375,7 @@ async def get_progress(
         for s in recent
     ]
     
-    return {
+    return fast_response({
         "total_games": total_games,
         "correct_games": correct_games,
         "accuracy_percentage": (correct_games / total_games * 100) if total_games > 0 else 0.0,
@@ -216,20 +383,119 @@ async def get_progress(
         "average_time_seconds": average_time,
         "difficulty_stats": difficulty_stats,
         "recent_sessions": recent_sessions
+    }, response)
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    window: LeaderboardWindow = LeaderboardWindow.DAILY,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Get the top players for a daily, weekly or all-time window, plus the caller's rank.
+    Served from this worker's in-memory index; other workers' scores appear after
+    the next periodic rebuild.
+    """
+    board = leaderboards.board(window.value)
+    top = board.top(limit)
+    
+    names = {}
+    if top:
+        names = dict((await db.execute(
+            select(User.id, User.display_name).where(User.id.in_([user_id for _, user_id, _ in top]))
+        )).all())
+    
+    me = board.rank(current_user.id)
+    
+    return {
+        "window": window.value,
+        "total_players": len(board),
+        "entries": [
+            {"rank": rank, "user_id": user_id, "display_name": names.get(user_id), "score": score}
+            for rank, user_id, score in top
+        ],
+        "me": {"rank": me[0], "score": me[1]} if me else None
     }
 
 @router.get("/history", response_model=List[GameSessionResponse])
 async def get_game_history(
-    limit: int = 10,
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_from_token)
 ):
     """
-    Get user's game history (recent sessions).
+    Get user's game history (recent sessions), newest first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    Supports If-None-Match with the returned ETag (304 until the next submit).
     """
-    sessions = db.query(GameSession).filter(
-        GameSession.user_id == current_user.id
-    ).order_by(GameSession.created_at.desc()).limit(limit).all()
+    not_modified = await conditional_get(db, current_user.id, if_none_match, response)
+    if not_modified is not None:
+        return not_modified
+    
+    query = select(GameSession).where(GameSession.user_id == current_user.id)
+    
+    if cursor:
+        created_at, session_id = decode_history_cursor(cursor)
+        stored_at = GameSession.created_at
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite keeps CURRENT_TIMESTAMP text ('YYYY-MM-DD HH:MM:SS') but binds
+            # datetimes with microseconds; compare both in datetime()'s format
+            stored_at, created_at = func.datetime(stored_at), func.datetime(created_at)
+        query = query.where(
+            tuple_(stored_at, GameSession.id) < tuple_(created_at, session_id)
+        )
+    
+    sessions = (await db.scalars(
+        query
+        .order_by(GameSession.created_at.desc(), GameSession.id.desc())
+        .limit(limit)
+    )).all()
+    
+    if len(sessions) == limit:
+        response.headers["X-Next-Cursor"] = encode_history_cursor(sessions[-1])
     
     return sessions
 
+@router.get("/export")
+async def export_game_sessions(
+    format: ExportFormat = ExportFormat.NDJSON,
+    user_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_teacher)
+):
+    """
+    Stream game sessions as NDJSON or CSV (teachers and admins).
+    Filter by student, by class (teacher_id) and by created_at range [start, end).
+    Teachers can only export their own class.
+    """
+    if current_user.role.value != "admin":
+        if teacher_id is not None and teacher_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Teachers can only export their own class")
+        teacher_id = current_user.id
+        if user_id is not None:
+            enrolled = await db.scalar(select(ClassEnrollment.student_id).where(
+                ClassEnrollment.teacher_id == current_user.id,
+                ClassEnrollment.student_id == user_id
+            ))
+            if enrolled is None:
+                raise HTTPException(status_code=403, detail="Student is not in your class")
+    
+    batches = iter_session_records(user_id=user_id, teacher_id=teacher_id, start=start, end=end)
+    if format == ExportFormat.CSV:
+        body, media_type = stream_csv(batches), "text/csv"
+    else:
+        body, media_type = stream_ndjson(batches), "application/x-ndjson"
+    
+    filename = f"game_sessions.{format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, EmailStr
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_db, upsert_insert
 from app.core.security_db import get_current_user_from_token, require_admin, require_teacher, require_student
-from app.models.database_models import User
+from app.core.system_counters import get_stats_snapshot
+from app.models.database_models import User, UserRole, UserGameStats, GameSession, ClassEnrollment, ClassInvite
 
 router = APIRouter()
 
+class EnrollStudentRequest(BaseModel):
+    email: EmailStr
+
 @router.get("/dashboard")
 async def get_dashboard(current_user: User = Depends(get_current_user_from_token)):
     """
@@ -55,10 +64,75 @@ async def get_student_progress(current_user: User = Depends(require_student)):
     }
 
 @router.get("/teacher/students")
-async def get_teacher_students(current_user: User = Depends(require_teacher)):
+async def get_teacher_students(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_teacher)
+):
     """
     Protected route - requires teacher role or higher
+    Returns the teacher's class roster with per-student game statistics,
+    ordered by student id. Pass `next_cursor` back as `cursor` for the next page.
     """
+    class_members = select(ClassEnrollment.student_id).where(
+        ClassEnrollment.teacher_id == current_user.id
+    )
+    
+    # Totals come from the per-difficulty rollup; last played uses the
+    # (user_id, created_at) index on game_sessions.
+    stats = (
+        select(
+            UserGameStats.user_id,
+            func.sum(UserGameStats.played).label("played"),
+            func.sum(UserGameStats.correct).label("correct"),
+            func.sum(UserGameStats.total_score).label("total_score")
+        )
+        .where(UserGameStats.user_id.in_(class_members))
+        .group_by(UserGameStats.user_id)
+        .subquery()
+    )
+    last_played = (
+        select(func.max(GameSession.created_at))
+        .where(GameSession.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    
+    query = (
+        select(
+            User.id,
+            User.email,
+            User.display_name,
+            func.coalesce(stats.c.played, 0).label("played"),
+            func.coalesce(stats.c.correct, 0).label("correct"),
+            func.coalesce(stats.c.total_score, 0).label("total_score"),
+            last_played.label("last_played")
+        )
+        .join(ClassEnrollment, ClassEnrollment.student_id == User.id)
+        .outerjoin(stats, stats.c.user_id == User.id)
+        .where(ClassEnrollment.teacher_id == current_user.id)
+    )
+    if cursor is not None:
+        query = query.where(User.id > cursor)
+    
+    rows = (await db.execute(query.order_by(User.id).limit(limit))).all()
+    
+    students = []
+    for row in rows:
+        accuracy = (row.correct / row.played * 100) if row.played else 0.0
+        students.append({
+            "id": row.id,
+            "name": row.display_name or row.email.split("@")[0],
+            "email": row.email,
+            "progress": round(accuracy),
+            "games_played": row.played,
+            "correct_games": row.correct,
+            "accuracy": accuracy,
+            "total_score": row.total_score,
+            "last_played": row.last_played.isoformat() if row.last_played else None
+        })
+    
     return {
         "message": "Teacher students endpoint",
         "teacher": {
@@ -66,12 +140,157 @@ async def get_teacher_students(current_user: User = Depends(require_teacher)):
             "email": current_user.email,
             "role": current_user.role.value
         },
-        "students": [
-            {"id": "student1", "name": "John Doe", "progress": 75},
-            {"id": "student2", "name": "Jane Smith", "progress": 90}
+        "students": students,
+        "next_cursor": rows[-1].id if len(rows) == limit else None
+    }
+
+@router.post("/teacher/students", status_code=status.HTTP_201_CREATED)
+async def add_teacher_student(
+    request: EnrollStudentRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_teacher)
+):
+    """
+    Protected route - invite a student to the teacher's class by email
+    Enrollment gives the teacher the student's stats and session exports, so
+    it only takes effect once the student accepts the invitation
+    (POST /student/invites/{teacher_id}/accept). Only student accounts can be
+    invited; other accounts get the same 404 as unknown emails, so this
+    cannot be used to probe for teachers or admins.
+    """
+    student_id = await db.scalar(
+        select(User.id).where(User.email == request.email, User.role == UserRole.STUDENT)
+    )
+    
+    if not student_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No student account with this email"
+        )
+    
+    enrolled = await db.scalar(select(ClassEnrollment.student_id).where(
+        ClassEnrollment.teacher_id == current_user.id,
+        ClassEnrollment.student_id == student_id
+    ))
+    if enrolled is not None:
+        return {"teacher_id": current_user.id, "student_id": student_id, "status": "enrolled"}
+    
+    stmt = upsert_insert(db, ClassInvite.__table__).values(
+        teacher_id=current_user.id,
+        student_id=student_id
+    ).on_conflict_do_nothing()
+    await db.execute(stmt)
+    await db.commit()
+    
+    return {"teacher_id": current_user.id, "student_id": student_id, "status": "invited"}
+
+@router.delete("/teacher/students/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_teacher_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_teacher)
+):
+    """
+    Protected route - remove a student from the teacher's class, or withdraw a pending invitation
+    """
+    removed = 0
+    for model in (ClassEnrollment, ClassInvite):
+        result = await db.execute(
+            delete(model).where(
+                model.teacher_id == current_user.id,
+                model.student_id == student_id
+            )
+        )
+        removed += result.rowcount
+    await db.commit()
+    
+    if not removed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not in class"
+        )
+
+@router.get("/student/invites")
+async def get_student_invites(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_student)
+):
+    """
+    Protected route - the student's pending class invitations
+    """
+    rows = (await db.execute(
+        select(User.id, User.email, User.display_name, ClassInvite.created_at)
+        .join(ClassInvite, ClassInvite.teacher_id == User.id)
+        .where(ClassInvite.student_id == current_user.id)
+        .order_by(ClassInvite.created_at)
+    )).all()
+    
+    return {
+        "invites": [
+            {
+                "teacher_id": row.id,
+                "teacher_name": row.display_name or row.email.split("@")[0],
+                "teacher_email": row.email,
+                "invited_at": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows
         ]
     }
 
+@router.post("/student/invites/{teacher_id}/accept")
+async def accept_student_invite(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_student)
+):
+    """
+    Protected route - accept a class invitation, giving the teacher access to the student's stats and exports
+    """
+    result = await db.execute(
+        delete(ClassInvite).where(
+            ClassInvite.teacher_id == teacher_id,
+            ClassInvite.student_id == current_user.id
+        )
+    )
+    if not result.rowcount:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No invitation from this teacher"
+        )
+    
+    stmt = upsert_insert(db, ClassEnrollment.__table__).values(
+        teacher_id=teacher_id,
+        student_id=current_user.id
+    ).on_conflict_do_nothing()
+    await db.execute(stmt)
+    await db.commit()
+    
+    return {"teacher_id": teacher_id, "student_id": current_user.id, "status": "enrolled"}
+
+@router.delete("/student/invites/{teacher_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def decline_student_invite(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_student)
+):
+    """
+    Protected route - decline a class invitation
+    """
+    result = await db.execute(
+        delete(ClassInvite).where(
+            ClassInvite.teacher_id == teacher_id,
+            ClassInvite.student_id == current_user.id
+        )
+    )
+    await db.commit()
+    
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No invitation from this teacher"
+        )
+
 @router.get("/teacher/assignments")
 async def get_teacher_assignments(current_user: User = Depends(require_teacher)):
     """
@@ -106,18 +325,16 @@ async def get_all_users(current_user: User = Depends(require_admin)):
     }
 
 @router.get("/admin/stats")
-async def get_system_stats(current_user: User = Depends(require_admin)):
+async def get_system_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
     """
     Protected route - admin system statistics
+    Served from maintained counters; may be up to ADMIN_STATS_MAX_STALENESS_SECONDS old.
     """
     return {
         "message": "Admin statistics endpoint",
-        "stats": {
-            "total_users": 150,
-            "total_students": 120,
-            "total_teachers": 25,
-            "total_admins": 5,
-            "games_played_today": 340
-        }
+        "stats": await get_stats_snapshot(db)
     }
 
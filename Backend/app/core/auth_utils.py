@@ -1,4 +1,9 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -18,6 +23,65 @@ def get_password_hash(password: str) -> str:
     password_bytes = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
     return pwd_context.hash(password_bytes)
 
+_hash_pending = 0
+
+# Queue wait = time between submitting a job and a pool thread picking it up
+hash_pool_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "queue_wait_seconds_total": 0.0,
+    "queue_wait_seconds_max": 0.0
+}
+
+@lru_cache(maxsize=None)
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Dedicated, size-limited pool so bcrypt never runs on the event loop"""
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix="password-hash"
+    )
+
+async def _run_in_hash_pool(func, *args):
+    """Run a hashing function in the hash pool, rejecting with 503 when saturated"""
+    global _hash_pending
+
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        hash_pool_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+
+    def job():
+        waited = time.perf_counter() - submitted
+        return waited, func(*args)
+
+    _hash_pending += 1
+    try:
+        waited, result = await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), job)
+    finally:
+        _hash_pending -= 1
+
+    hash_pool_stats["completed"] += 1
+    hash_pool_stats["queue_wait_seconds_total"] += waited
+    hash_pool_stats["queue_wait_seconds_max"] = max(hash_pool_stats["queue_wait_seconds_max"], waited)
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hash pool"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hash pool"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+def get_hash_pool_stats() -> dict:
+    """Snapshot of hash pool usage, including jobs currently queued or running"""
+    return {**hash_pool_stats, "pending": _hash_pending}
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
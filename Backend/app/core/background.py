@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, Callable, Union
+
+
+class PeriodicTask:
+    """
+    Runs `step` on the event loop now and then every `interval` seconds until stopped.
+    Failures are logged and retried after `interval`. A non-positive interval
+    runs `step` once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        step: Callable[[], Awaitable],
+        interval: Union[float, Callable[[], float]]
+    ):
+        self.name = name
+        self._step = step
+        # A callable is re-read after every run (settings, or a delay derived from the last result)
+        self._interval = interval
+        self._task = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval() if callable(self._interval) else self._interval
+
+    async def _loop(self):
+        while True:
+            try:
+                await self._step()
+            except Exception as e:
+                print(f"{self.name} failed: {e}")
+            delay = self.interval
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Start the loop (call from a running event loop); no-op if already running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
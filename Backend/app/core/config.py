@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -5,18 +6,85 @@ from typing import Optional
 class Settings(BaseSettings):
     # PostgreSQL Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # Seconds; -1 disables
+    DB_POOL_USE_LIFO: bool = False
+    # "pre_ping": test each connection on checkout (one extra round trip)
+    # "recycle": no ping; rely on DB_POOL_RECYCLE to retire connections before
+    #            server/firewall idle timeouts (pair with DB_POOL_USE_LIFO so
+    #            surplus connections idle out)
+    DB_POOL_LIVENESS: str = "pre_ping"
     
     # Firebase Configuration (Only for Google Sign-in)
     FIREBASE_PROJECT_ID: str
     FIREBASE_PRIVATE_KEY: str
     FIREBASE_CLIENT_EMAIL: str
     FIREBASE_DATABASE_URL: str
+    # Google's public signing certificates for Firebase ID tokens
+    FIREBASE_CERTS_URL: str = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+    FIREBASE_TOKEN_CACHE_SIZE: int = 10000
+    FIREBASE_TOKEN_CACHE_TTL_SECONDS: int = 300
 
     # JWT Configuration
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Authenticated user cache (per worker)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Number of solution-count tiers per difficulty in the puzzle bank
+    PUZZLE_TIERS: int = 3
+
+    # Seconds between leaderboard rebuilds from the rollup tables (0 = startup only)
+    LEADERBOARD_REFRESH_SECONDS: int = 300
+
+    # Maximum age of the cached /api/admin/stats snapshot
+    ADMIN_STATS_MAX_STALENESS_SECONDS: float = 10.0
+
+    # Per-worker token-bucket rate limits (requests per minute, plus burst size)
+    RATE_LIMIT_ENABLED: bool = True
+    # Per client IP; generous because a school or office NAT puts a whole class
+    # behind one address (the per-email limit is what slows password guessing)
+    RATE_LIMIT_REGISTER_PER_MINUTE: int = 60
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 300  # Login and Google sign-in
+    RATE_LIMIT_IP_BURST: int = 60
+    RATE_LIMIT_LOGIN_EMAIL_PER_MINUTE: int = 10  # Per account email
+    RATE_LIMIT_AUTH_BURST: int = 10  # Burst of the per-email bucket
+    RATE_LIMIT_SUBMIT_PER_MINUTE: int = 120  # Per user
+    RATE_LIMIT_SUBMIT_BURST: int = 30
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Comma-separated IPs/CIDRs of reverse proxies (load balancer, ingress) whose
+    # X-Forwarded-For is used for the client IP; empty = use the socket peer
+    RATE_LIMIT_TRUSTED_PROXIES: str = ""
+
+    # Replay cache for Idempotency-Key on /api/game/submit (per worker; the DB table is the backstop)
+    IDEMPOTENCY_CACHE_SIZE: int = 50000
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+
+    # Monthly partitions of game_sessions (PostgreSQL; see manage_partitions.py)
+    GAME_SESSION_PARTITIONS_AHEAD: int = 3  # Upcoming months kept created
+    GAME_SESSION_RETENTION_MONTHS: int = 12  # Older months are archived to files
+    GAME_SESSION_ARCHIVE_DIR: str = "archive"  # Relative to the Backend directory unless absolute
+
+    # Group-commit buffering of game session inserts (opt-in)
+    GAME_SESSION_WRITE_BEHIND: bool = False
+    GAME_SESSION_BATCH_WINDOW_MS: float = 5.0
+    GAME_SESSION_BATCH_MAX: int = 500
+
+    # Run create_all during app startup (otherwise run init_game_tables.py explicitly)
+    AUTO_CREATE_SCHEMA: bool = False
+
+    # Encode hot game responses with orjson, skipping response_model re-validation
+    FAST_JSON_RESPONSES: bool = False
+
     # API Configuration
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "Balance Scale Addition API"
@@ -26,4 +94,17 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Load settings from the environment / .env on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """Module-level `settings` that defers reading the environment until first access"""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
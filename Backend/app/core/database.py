@@ -1,26 +1,164 @@
-from sqlalchemy import create_engine
+import os
+import time
+from functools import lru_cache
+from sqlalchemy import create_engine, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_database_url(async_driver: bool = False) -> str:
+    """
+    Return DATABASE_URL with an explicit driver.
+    PostgreSQL always uses psycopg 3, which supports both sync and async I/O;
+    SQLite (local stand-in) switches between pysqlite and aiosqlite.
+    """
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+psycopg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite" if async_driver else "sqlite+pysqlite")
+    return url.render_as_string(hide_password=False)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        }
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkout_stats["checkouts"] += 1
+            self.checkout_stats["wait_seconds_total"] += waited
+            self.checkout_stats["wait_seconds_max"] = max(self.checkout_stats["wait_seconds_max"], waited)
+
+
+def get_pool_options() -> dict:
+    """Pool sizing and liveness options from settings"""
+    if settings.DB_POOL_LIVENESS not in ("pre_ping", "recycle"):
+        raise ValueError(f"Unknown DB_POOL_LIVENESS: {settings.DB_POOL_LIVENESS}")
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+        "pool_pre_ping": settings.DB_POOL_LIVENESS == "pre_ping"
+    }
+
+
+# Create AsyncSessionLocal class (bound to the async engine when it is first created)
+# expire_on_commit=False keeps loaded attributes usable after commit without
+# an implicit (and in async code, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    """Async engine used by request handlers, created on first use"""
+    async_engine = create_async_engine(
+        get_database_url(async_driver=True),
+        poolclass=InstrumentedAsyncQueuePool,
+        **get_pool_options()
+    )
+    AsyncSessionLocal.configure(bind=async_engine)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """Sync engine, only used for schema management and offline scripts"""
+    return create_engine(get_database_url(), pool_pre_ping=True)
+
+def __getattr__(name):
+    # Lazy module attributes so importing this module never touches settings
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Create Base class for models
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def upsert_insert(db, table):
+    """
+    Dialect-specific INSERT supporting on_conflict_do_update().
+    `db` may be a Session/AsyncSession or a Connection.
+    """
+    dialect = db.dialect if hasattr(db, "dialect") else db.get_bind().dialect
+    if dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+def create_missing_indexes(conn):
+    """
+    CREATE INDEX IF NOT EXISTS for every model index.
+    create_all only indexes tables it creates, so indexes added to a model
+    later never reach tables that already existed.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+def create_schema(conn):
+    Base.metadata.create_all(conn)
+    create_missing_indexes(conn)
 
 # Create all tables
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with get_engine().begin() as conn:
+        create_schema(conn)
+
+async def init_db_async():
+    """create_all over the async engine, for use inside the app's lifespan"""
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(create_schema)
+
+def get_pool_stats() -> dict:
+    """Live view of this worker's async connection pool"""
+    if not get_async_engine.cache_info().currsize:
+        return {"pid": os.getpid(), "initialized": False}
+    pool = get_async_engine().pool
+    return {
+        "pid": os.getpid(),
+        "initialized": True,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **getattr(pool, "checkout_stats", {})
+    }
 
+async def dispose_engines():
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: pip install orjson
+    orjson = None
+
+
+def fast_json_enabled() -> bool:
+    return settings.FAST_JSON_RESPONSES and orjson is not None
+
+
+def fast_response(payload: dict, response: Optional[Response] = None):
+    """
+    Return `payload` as an orjson-encoded response when FAST_JSON_RESPONSES is on.
+    Returning a Response skips FastAPI's response_model validation, so only use
+    this for payloads built internally with the documented shape.
+    Headers set on the route's injected `response` are carried over.
+    """
+    if fast_json_enabled():
+        headers = None
+        if response is not None:
+            headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        return ORJSONResponse(payload, headers=headers)
+    return payload
@@ -1,11 +1,22 @@
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
+from jose import JWTError, jwt
+from app.core.background import PeriodicTask
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+import asyncio
+import hashlib
 import json
+import re
+import threading
+import time
+import urllib.request
+from typing import Optional
 
 
 def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
+    """Initialize Firebase Admin SDK (imported lazily; only Admin SDK calls need it)"""
+    import firebase_admin
+    from firebase_admin import credentials
+
     if not firebase_admin._apps:
         # Parse the private key (handle escaped newlines)
         private_key = settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n')
@@ -25,19 +36,146 @@ def initialize_firebase():
         print("Firebase Admin SDK initialized successfully")
 
 
+class FirebaseKeyStore:
+    """
+    Google's Firebase ID token signing certificates, keyed by `kid`.
+    Refreshed ahead of expiry based on the Cache-Control max-age of the
+    certificate endpoint, so verification never waits on the network.
+    """
+
+    DEFAULT_MAX_AGE = 3600
+    REFRESH_MARGIN = 300
+    RETRY_DELAY = 30
+    # Minimum seconds between fetches forced by an unknown `kid`, so tokens
+    # with made-up key ids cannot make every sign-in download certificates
+    FORCED_REFRESH_INTERVAL = 60
+
+    def __init__(self, url: Optional[str] = None):
+        # None = read FIREBASE_CERTS_URL on use
+        self._url = url
+        self._certs = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._forced_refresh_lock = threading.Lock()
+        # Prefetch, then refresh ahead of expiry
+        self.refresher = PeriodicTask("Firebase certificate refresh", self._refresh, interval=self._refresh_delay)
+
+    @property
+    def url(self) -> str:
+        return self._url or settings.FIREBASE_CERTS_URL
+
+    @url.setter
+    def url(self, value: str):
+        self._url = value
+
+    def fetch(self) -> dict:
+        """Download the current certificates (blocking)"""
+        with urllib.request.urlopen(self.url, timeout=10) as response:
+            certs = json.loads(response.read())
+            cache_control = response.headers.get("Cache-Control", "")
+        match = re.search(r"max-age=(\d+)", cache_control)
+        max_age = int(match.group(1)) if match else self.DEFAULT_MAX_AGE
+        with self._lock:
+            self._certs = certs
+            self._fetched_at = time.time()
+            self._expires_at = self._fetched_at + max_age
+        return certs
+
+    def get_certs(self, force_refresh: bool = False) -> dict:
+        """
+        Return cached certificates, fetching only if missing or expired.
+        force_refresh fetches at most once per FORCED_REFRESH_INTERVAL; callers
+        within the interval (or waiting on an in-flight fetch) get the cache.
+        """
+        if force_refresh and self._certs:
+            with self._forced_refresh_lock:
+                if time.time() - self._fetched_at < self.FORCED_REFRESH_INTERVAL:
+                    return self._certs
+                return self.fetch()
+        if not self._certs or time.time() >= self._expires_at:
+            return self.fetch()
+        return self._certs
+
+    async def _refresh(self):
+        await asyncio.to_thread(self.fetch)
+
+    def _refresh_delay(self) -> float:
+        # After a failed fetch the old expiry is past or within the margin, so this is RETRY_DELAY
+        return max(self._expires_at - time.time() - self.REFRESH_MARGIN, self.RETRY_DELAY)
+
+
+firebase_keys = FirebaseKeyStore()
+
+
+class VerifiedTokenCache(TTLCache):
+    """Decoded claims of recently verified ID tokens by sha256(token)"""
+
+    size_setting = "FIREBASE_TOKEN_CACHE_SIZE"
+    ttl_setting = "FIREBASE_TOKEN_CACHE_TTL_SECONDS"
+
+
+_verified_tokens = VerifiedTokenCache()
+
+
 def verify_firebase_token(token: str):
-    """Verify Firebase ID token"""
+    """Verify Firebase ID token locally against Google's public certificates"""
     try:
-        decoded_token = firebase_auth.verify_id_token(token)
+        kid = jwt.get_unverified_header(token).get("kid")
+        certs = firebase_keys.get_certs()
+        if kid not in certs:
+            # Keys may have rotated since the last refresh (throttled)
+            certs = firebase_keys.get_certs(force_refresh=True)
+        if kid not in certs:
+            raise JWTError("Unknown signing key")
+
+        project_id = settings.FIREBASE_PROJECT_ID
+        decoded_token = jwt.decode(
+            token,
+            certs[kid],
+            algorithms=["RS256"],
+            audience=project_id,
+            issuer=f"https://securetoken.google.com/{project_id}"
+        )
+
+        uid = decoded_token.get("sub")
+        if not uid or len(uid) > 128:
+            raise JWTError("Invalid subject")
+        if decoded_token.get("auth_time", 0) > time.time():
+            raise JWTError("Token auth_time is in the future")
+
+        decoded_token["uid"] = uid
         return decoded_token
     except Exception as e:
         print(f"Token verification failed: {e}")
         return None
 
 
+async def verify_firebase_token_async(token: str):
+    """
+    Verify Firebase ID token off the event loop, reusing recent results.
+    Successful verifications are cached by token digest until the token
+    expires or FIREBASE_TOKEN_CACHE_TTL_SECONDS elapses, whichever is first.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _verified_tokens.lookup(digest)
+    if cached is not None:
+        return dict(cached)
+
+    decoded_token = await asyncio.to_thread(verify_firebase_token, token)
+    if decoded_token:
+        ttl_seconds = min(decoded_token.get("exp", 0) - time.time(), _verified_tokens.ttl_seconds)
+        if ttl_seconds > 0:
+            _verified_tokens.store(digest, decoded_token, ttl_seconds)
+        return dict(decoded_token)
+    return None
+
+
 def get_user_by_uid(uid: str):
     """Get user information by UID"""
     try:
+        initialize_firebase()
+        from firebase_admin import auth as firebase_auth
         user = firebase_auth.get_user(uid)
         return user
     except Exception as e:
@@ -48,6 +186,8 @@ def get_user_by_uid(uid: str):
 def set_custom_user_claims(uid: str, claims: dict):
     """Set custom claims for a user (e.g., roles)"""
     try:
+        initialize_firebase()
+        from firebase_admin import auth as firebase_auth
         firebase_auth.set_custom_user_claims(uid, claims)
         return True
     except Exception as e:
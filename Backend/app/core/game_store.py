@@ -0,0 +1,225 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, upsert_insert
+from app.core.leaderboard import leaderboards
+from app.models.database_models import GameSession, UserDailyScore, UserDataVersion, UserGameStats
+
+
+async def insert_game_sessions(db: AsyncSession, rows: List[dict]) -> List[int]:
+    """Insert game session rows in one multi-row INSERT ... RETURNING id (caller commits)"""
+    result = await db.execute(
+        insert(GameSession).returning(GameSession.id, sort_by_parameter_order=True),
+        rows
+    )
+    return list(result.scalars())
+
+
+async def record_game_stats(db: AsyncSession, rows: List[dict]):
+    """Fold game session rows into the per-user rollup table (caller commits)"""
+    deltas = {}
+    for row in rows:
+        time_spent = row.get("time_spent_seconds")
+        timed = bool(time_spent and time_spent > 0)
+        key = (row["user_id"], row["difficulty"])
+        delta = deltas.setdefault(key, {
+            "user_id": row["user_id"],
+            "difficulty": row["difficulty"],
+            "played": 0,
+            "correct": 0,
+            "total_score": 0,
+            "time_sum": 0,
+            "time_count": 0
+        })
+        delta["played"] += 1
+        delta["correct"] += int(row["is_correct"])
+        delta["total_score"] += row["score"]
+        delta["time_sum"] += time_spent if timed else 0
+        delta["time_count"] += int(timed)
+
+    # One row per key, so a multi-row upsert never hits the same row twice; rows go
+    # in key order so concurrent batches lock shared rows in the same order (no deadlock)
+    stmt = upsert_insert(db, UserGameStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserGameStats.user_id, UserGameStats.difficulty],
+        set_={
+            "played": UserGameStats.played + stmt.excluded.played,
+            "correct": UserGameStats.correct + stmt.excluded.correct,
+            "total_score": UserGameStats.total_score + stmt.excluded.total_score,
+            "time_sum": UserGameStats.time_sum + stmt.excluded.time_sum,
+            "time_count": UserGameStats.time_count + stmt.excluded.time_count,
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt, [deltas[key] for key in sorted(deltas)])
+
+
+async def record_daily_scores(db: AsyncSession, rows: List[dict]):
+    """Fold game session rows into today's (UTC) per-user score totals (caller commits)"""
+    today = datetime.now(timezone.utc).date()
+    deltas = {}
+    for row in rows:
+        delta = deltas.setdefault(row["user_id"], {"user_id": row["user_id"], "day": today, "score": 0, "games": 0})
+        delta["score"] += row["score"]
+        delta["games"] += 1
+
+    stmt = upsert_insert(db, UserDailyScore.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDailyScore.user_id, UserDailyScore.day],
+        set_={
+            "score": UserDailyScore.score + stmt.excluded.score,
+            "games": UserDailyScore.games + stmt.excluded.games
+        }
+    )
+    # Key order, as in record_game_stats
+    await db.execute(stmt, [deltas[user_id] for user_id in sorted(deltas)])
+
+
+async def bump_data_versions(db: AsyncSession, rows: List[dict]):
+    """Advance the data version of every user with new game sessions (caller commits)"""
+    stmt = upsert_insert(db, UserDataVersion.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDataVersion.user_id],
+        set_={"version": UserDataVersion.version + 1}
+    )
+    await db.execute(stmt, [{"user_id": user_id, "version": 1} for user_id in sorted({row["user_id"] for row in rows})])
+
+
+async def get_data_version(db: AsyncSession, user_id: int) -> int:
+    """Current data version of a user (0 before their first game)"""
+    version = await db.scalar(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id))
+    return version or 0
+
+
+async def save_game_sessions(db: AsyncSession, rows: List[dict]) -> List[int]:
+    """Insert game sessions and update every derived table in the current transaction"""
+    session_ids = await insert_game_sessions(db, rows)
+    await record_game_stats(db, rows)
+    await record_daily_scores(db, rows)
+    await bump_data_versions(db, rows)
+    return session_ids
+
+
+def publish_game_sessions(rows: List[dict], session_ids: List[int]):
+    """Update in-process indexes once the transaction saving `rows` has committed"""
+    leaderboards.record_sessions(rows, session_ids)
+
+
+class GameSessionWriteBuffer:
+    """
+    Group-commit buffer for game session inserts.
+    Rows submitted by concurrent requests within `window_seconds` (or until
+    `max_batch` rows are queued) are written in one transaction, and each
+    caller receives its own session id once that transaction commits.
+    If the batch transaction fails (e.g. one row's user was deleted, or the
+    batch lost a deadlock), each row is retried in its own transaction so the
+    failure only reaches the callers whose rows actually fail.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, max_batch: Optional[int] = None):
+        # None = read GAME_SESSION_BATCH_WINDOW_MS / GAME_SESSION_BATCH_MAX on use
+        self._window_seconds = window_seconds
+        self._max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        self._flushes = set()
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "failed_batches": 0,
+            "failed_rows": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "flush_seconds_total": 0.0,
+            "flush_seconds_max": 0.0
+        }
+
+    @property
+    def window_seconds(self) -> float:
+        if self._window_seconds is not None:
+            return self._window_seconds
+        return settings.GAME_SESSION_BATCH_WINDOW_MS / 1000
+
+    @property
+    def max_batch(self) -> int:
+        return self._max_batch if self._max_batch is not None else settings.GAME_SESSION_BATCH_MAX
+
+    async def submit(self, row: dict) -> int:
+        """Queue one row and wait for its committed session id"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._start_flush)
+
+        return await future
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, rows: List[dict]) -> List[int]:
+        async with AsyncSessionLocal() as db:
+            session_ids = await save_game_sessions(db, rows)
+            await db.commit()
+        publish_game_sessions(rows, session_ids)
+        return session_ids
+
+    async def _flush(self, batch):
+        started = time.perf_counter()
+        rows = [row for row, _ in batch]
+        try:
+            session_ids = await self._write(rows)
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            if len(batch) == 1:
+                self.stats["failed_rows"] += 1
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # Isolate the failing rows instead of failing every caller in the batch
+            for row, future in batch:
+                try:
+                    session_id = (await self._write([row]))[0]
+                except Exception as row_error:
+                    self.stats["failed_rows"] += 1
+                    if not future.done():
+                        future.set_exception(row_error)
+                else:
+                    if not future.done():
+                        future.set_result(session_id)
+            return
+
+        for (_, future), session_id in zip(batch, session_ids):
+            if not future.done():
+                future.set_result(session_id)
+
+        elapsed = time.perf_counter() - started
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(batch)
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+        self.stats["flush_seconds_total"] += elapsed
+        self.stats["flush_seconds_max"] = max(self.stats["flush_seconds_max"], elapsed)
+
+    async def close(self):
+        """Flush anything still queued and wait for in-flight batches"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+game_session_writer = GameSessionWriteBuffer()
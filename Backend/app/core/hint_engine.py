@@ -0,0 +1,85 @@
+from functools import lru_cache
+from typing import List
+from app.core.puzzle_bank import DIFFICULTY_CONFIGS
+from app.models.database_models import DifficultyLevel
+
+
+class HintEngine:
+    """
+    Precomputed reachability for one difficulty level.
+    Bit `s` of reachable[p] is set when `s` can be written as the sum of at
+    most `p` values in [min_value, max_value] (bit 0 = the empty sum).
+    """
+
+    def __init__(self, difficulty: DifficultyLevel):
+        config = DIFFICULTY_CONFIGS[difficulty]
+        self.min_value = config["min_value"]
+        self.max_value = config["max_value"]
+        self.max_addends = config["max_addends"]
+        self.max_target = config["target_range"][1]
+
+        mask = (1 << (self.max_target + 1)) - 1
+        self.reachable = [1]
+        for _ in range(self.max_addends):
+            previous = self.reachable[-1]
+            current = previous
+            for value in range(self.min_value, self.max_value + 1):
+                current |= previous << value
+            self.reachable.append(current & mask)
+
+    def can_complete(self, remaining: int, parts_left: int) -> bool:
+        """Whether `remaining` can be made with at most `parts_left` more addends"""
+        if remaining < 0 or remaining > self.max_target or parts_left < 0:
+            return False
+        return bool((self.reachable[parts_left] >> remaining) & 1)
+
+    def smallest_next_addend(self, remaining: int, parts_left: int):
+        """Smallest addend that keeps `remaining` completable, or None"""
+        if parts_left <= 0 or remaining < self.min_value:
+            return None
+        # Candidate leftovers after adding v are remaining - max_value .. remaining - min_value;
+        # the largest reachable leftover corresponds to the smallest addend.
+        low = max(remaining - self.max_value, 0)
+        high = min(remaining - self.min_value, self.max_target)
+        if high < low:
+            return None
+        window = (self.reachable[parts_left - 1] >> low) & ((1 << (high - low + 1)) - 1)
+        if not window:
+            return None
+        return remaining - (low + window.bit_length() - 1)
+
+    def hint(self, target: int, user_answer: List[int]) -> dict:
+        """Smallest next step from a partial answer toward a valid decomposition"""
+        remaining = target - sum(user_answer)
+        parts_left = self.max_addends - len(user_answer)
+
+        if remaining == 0 and user_answer:
+            return {"action": "done", "value": None, "remaining": 0, "solvable": True,
+                    "message": "The scale is already balanced! 🎉"}
+
+        if self.can_complete(remaining, parts_left):
+            value = self.smallest_next_addend(remaining, parts_left)
+            return {"action": "add", "value": value, "remaining": remaining, "solvable": True,
+                    "message": f"Try adding a {value}."}
+
+        # Dead end: find the smallest single addend whose removal reopens a solution
+        for value in sorted(set(user_answer)):
+            if self.can_complete(remaining + value, parts_left + 1):
+                return {"action": "remove", "value": value, "remaining": remaining, "solvable": False,
+                        "message": f"Try taking away the {value}."}
+
+        return {"action": "reset", "value": None, "remaining": remaining, "solvable": False,
+                "message": "Start over and try a different combination."}
+
+
+@lru_cache(maxsize=None)
+def get_hint_engine(difficulty: DifficultyLevel) -> HintEngine:
+    """Build (once per worker) the hint engine for a difficulty level"""
+    return HintEngine(difficulty)
+
+
+def build_hint_engines():
+    """Precompute reachability for every difficulty with hints enabled"""
+    for difficulty, config in DIFFICULTY_CONFIGS.items():
+        if config["hints_enabled"]:
+            get_hint_engine(difficulty)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import get_async_engine
+from app.core.ttl_cache import TTLCache
+from app.models.database_models import SubmitIdempotencyKey
+
+
+class IdempotencyCache(TTLCache):
+    """
+    Bounded per-worker LRU of submit responses by (user_id, Idempotency-Key), with a TTL.
+    Misses (other worker, evicted, restarted) fall back to the submit_idempotency_keys table.
+    """
+
+    size_setting = "IDEMPOTENCY_CACHE_SIZE"
+    ttl_setting = "IDEMPOTENCY_TTL_SECONDS"
+
+    def get(self, user_id: int, key: str) -> Optional[dict]:
+        return self.lookup((user_id, key))
+
+    def put(self, user_id: int, key: str, response: dict):
+        self.store((user_id, key), dict(response))
+
+
+idempotency_cache = IdempotencyCache()
+
+
+async def purge_expired_keys(ttl_seconds: Optional[float] = None) -> int:
+    """Delete stored Idempotency-Keys older than the TTL; returns the number removed"""
+    ttl_seconds = settings.IDEMPOTENCY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    async with get_async_engine().begin() as conn:
+        result = await conn.execute(
+            delete(SubmitIdempotencyKey).where(SubmitIdempotencyKey.created_at < cutoff)
+        )
+    return result.rowcount
+
+
+async def _purge_and_report():
+    removed = await purge_expired_keys()
+    if removed:
+        print(f"Purged {removed} expired idempotency keys")
+
+
+# Keeps submit_idempotency_keys bounded to the keys still within the TTL
+idempotency_key_purger = PeriodicTask("Idempotency key purge", _purge_and_report, interval=3600)
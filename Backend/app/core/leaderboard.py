@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+from sqlalchemy import func, select
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import get_async_engine
+from app.models.database_models import GameSession, UserDailyScore, UserGameStats
+
+LEADERBOARD_WINDOWS = ("daily", "weekly", "all_time")
+
+
+# Users are packed with their score into one sortable int: ascending order of
+# -score * USER_ID_SPACE + user_id is "highest score first, ties by user id"
+USER_ID_SPACE = 1 << 32
+
+
+class ScoreIndex:
+    """
+    Order-statistics index of integer scores per user.
+    Entries live in a SortedList of packed (-score, user_id) keys, so updates,
+    "my rank" and top-N cost O(log n) in the number of players, independent
+    of how high scores get or how many players share a score.
+    """
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        self.scores = dict(scores or {})
+        self._keys = SortedList(_pack(score, user_id) for user_id, score in self.scores.items())
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, user_id: int, delta: int):
+        """Add `delta` to a user's score (registering the user if new)"""
+        old = self.scores.get(user_id)
+        if old is not None:
+            if delta == 0:
+                return
+            self._keys.remove(_pack(old, user_id))
+        new = (old or 0) + delta
+        self.scores[user_id] = new
+        self._keys.add(_pack(new, user_id))
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """(rank, score) with ties sharing a rank, or None if the user has no entry"""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        # Everyone ahead of the first key with this score has a strictly higher score
+        return self._keys.bisect_left(_pack(score, 0)) + 1, score
+
+    def top(self, n: int) -> List[Tuple[int, int, int]]:
+        """Up to n (rank, user_id, score) entries, highest score first, ties by user id"""
+        entries = []
+        for position, key in enumerate(self._keys.islice(0, n)):
+            score, user_id = _unpack(key)
+            if entries and entries[-1][2] == score:
+                rank = entries[-1][0]
+            else:
+                rank = position + 1
+            entries.append((rank, user_id, score))
+        return entries
+
+
+def _pack(score: int, user_id: int) -> int:
+    return -score * USER_ID_SPACE + user_id
+
+
+def _unpack(key: int) -> Tuple[int, int]:
+    return -(key // USER_ID_SPACE), key % USER_ID_SPACE
+
+
+def window_period(window: str, now: Optional[datetime] = None):
+    """Start date of the window containing `now` (UTC); None for all-time"""
+    today = (now or datetime.now(timezone.utc)).date()
+    if window == "daily":
+        return today
+    if window == "weekly":
+        return today - timedelta(days=today.weekday())
+    return None
+
+
+class Leaderboards:
+    """In-process daily, weekly and all-time leaderboards for this worker"""
+
+    def __init__(self):
+        self._boards = {window: (window_period(window), ScoreIndex()) for window in LEADERBOARD_WINDOWS}
+        # (session id, row) published while a rebuild is reading, None when no rebuild runs
+        self._published = None
+        # Initial load, then periodic rebuilds to pick up scores recorded by other workers
+        self.refresher = PeriodicTask(
+            "Leaderboard rebuild", self.rebuild, interval=lambda: settings.LEADERBOARD_REFRESH_SECONDS
+        )
+
+    def board(self, window: str) -> ScoreIndex:
+        """Index for the current period, starting a fresh one when the period rolls over"""
+        period = window_period(window)
+        current_period, index = self._boards[window]
+        if current_period != period:
+            index = ScoreIndex()
+            self._boards[window] = (period, index)
+        return index
+
+    def record_sessions(self, rows: List[dict], session_ids: List[int]):
+        """Apply newly committed game sessions to every window"""
+        if self._published is not None:
+            self._published.extend(zip(session_ids, rows))
+        for window in LEADERBOARD_WINDOWS:
+            index = self.board(window)
+            for row in rows:
+                index.add(row["user_id"], row["score"])
+
+    async def rebuild(self):
+        """
+        Reload every window from the user_daily_scores / user_game_stats rollups.
+        Sessions published while the rebuild runs are replayed onto the new
+        boards unless the snapshot already counts them. A session's rollups
+        commit with its game_sessions row, so the snapshot counts it exactly when
+        that row is visible in the same transaction.
+        """
+        today = window_period("daily")
+        week_start = window_period("weekly")
+        self._published = []
+        try:
+            async with get_async_engine().connect() as conn:
+                if conn.dialect.name == "sqlite":
+                    # pysqlite only opens a transaction before writes; without one every
+                    # read sees a different snapshot. Writers wait for it (busy timeout)
+                    await conn.exec_driver_sql("BEGIN")
+                else:
+                    await conn.execution_options(isolation_level="REPEATABLE READ")
+                daily = await conn.execute(
+                    select(UserDailyScore.user_id, UserDailyScore.score)
+                    .where(UserDailyScore.day == today)
+                )
+                daily = dict(daily.all())
+                weekly = await conn.execute(
+                    select(UserDailyScore.user_id, func.sum(UserDailyScore.score))
+                    .where(UserDailyScore.day >= week_start)
+                    .group_by(UserDailyScore.user_id)
+                )
+                weekly = dict(weekly.all())
+                all_time = await conn.execute(
+                    select(UserGameStats.user_id, func.sum(UserGameStats.total_score))
+                    .group_by(UserGameStats.user_id)
+                )
+                all_time = dict(all_time.all())
+
+                # Building a million-entry index takes about a second; keep it off the event loop
+                boards = {
+                    "daily": (today, await asyncio.to_thread(ScoreIndex, daily)),
+                    "weekly": (week_start, await asyncio.to_thread(ScoreIndex, weekly)),
+                    "all_time": (None, await asyncio.to_thread(ScoreIndex, all_time))
+                }
+
+                # Keep checking until a check returns with nothing new published, so
+                # no await separates the last check from the swap below
+                missed = []
+                checked = 0
+                while checked < len(self._published):
+                    batch = self._published[checked:]
+                    checked += len(batch)
+                    visible = set(await conn.scalars(
+                        select(GameSession.id).where(GameSession.id.in_([session_id for session_id, _ in batch]))
+                    ))
+                    missed.extend(row for session_id, row in batch if session_id not in visible)
+                for _, index in boards.values():
+                    for row in missed:
+                        index.add(row["user_id"], row["score"])
+                self._boards = boards
+        finally:
+            self._published = None
+
+
+leaderboards = Leaderboards()
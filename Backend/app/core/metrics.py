@@ -0,0 +1,165 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+# Upper bounds (seconds) of latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request accumulator of time spent in database calls
+_db_time: ContextVar[Optional[List[float]]] = ContextVar("db_time", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram; per-bucket counts are made cumulative only on export"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """Per-worker HTTP metrics keyed by (method, route template, status)"""
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str, int], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, db_seconds: float):
+        key = (method, route, status)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+
+        db_key = (method, route)
+        histogram = self.db_time.get(db_key)
+        if histogram is None:
+            histogram = self.db_time[db_key] = Histogram()
+        histogram.observe(db_seconds)
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status, in-flight requests and DB time.
+    Routes are labelled by their path template (e.g. /api/game/submit), never the raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+        db_time = [0.0]
+        token = _db_time.set(db_time)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        metrics = request_metrics
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            _db_time.reset(token)
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"],
+                route.path if route is not None else "<unmatched>",
+                status_holder[0],
+                elapsed,
+                db_time[0]
+            )
+
+
+def instrument_engine(engine):
+    """Attribute cursor execution time on `engine` (a sync Engine) to the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        db_time = _db_time.get()
+        if db_time is not None:
+            db_time[0] += time.perf_counter() - context._query_started
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    separator = "," if labels else ""
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_prometheus(gauges: Optional[Dict[str, Tuple[str, str, float]]] = None) -> str:
+    """
+    Prometheus text exposition (format 0.0.4) of request metrics plus extra
+    `gauges`: {metric_name: (type, help, value)}.
+    """
+    metrics = request_metrics
+    lines = [
+        "# HELP http_request_duration_seconds HTTP request latency by route and status.",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for (method, route, status), histogram in list(metrics.latency.items()):
+        lines += _histogram_lines(
+            "http_request_duration_seconds",
+            _labels(method=method, route=route, status=status),
+            histogram
+        )
+
+    lines += [
+        "# HELP http_request_db_seconds Time spent in database calls per request.",
+        "# TYPE http_request_db_seconds histogram"
+    ]
+    for (method, route), histogram in list(metrics.db_time.items()):
+        lines += _histogram_lines("http_request_db_seconds", _labels(method=method, route=route), histogram)
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {metrics.in_flight}"
+    ]
+
+    for name, (metric_type, help_text, value) in (gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {value}"]
+
+    return "\n".join(lines) + "\n"
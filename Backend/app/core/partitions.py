@@ -0,0 +1,163 @@
+"""
+Monthly range partitioning of game_sessions on created_at (PostgreSQL only).
+
+The ORM model is unchanged: a partitioned game_sessions has the same columns,
+with a (id, created_at) primary key because PostgreSQL requires the partition
+key in every unique constraint. manage_partitions.py converts an existing
+table and archives old months; the app keeps upcoming months created.
+"""
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import get_async_engine
+from app.core.session_export import archive_path, write_session_archive
+from app.models.database_models import GameSession
+
+PARENT_TABLE = GameSession.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def month_floor(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a month as UTC timestamps"""
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    following = add_months(month, 1)
+    return start, datetime(following.year, following.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARENT_TABLE})
+
+
+def list_partitions(conn: Connection) -> List[date]:
+    """Months that currently have a partition, oldest first"""
+    names = conn.scalars(text(
+        "SELECT child.relname FROM pg_inherits"
+        " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+        " WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE})
+    months = []
+    for name in names:
+        suffix = name[len(PARENT_TABLE) + 1:]
+        if name != DEFAULT_PARTITION and len(suffix) == 7:
+            months.append(date(int(suffix[:4]), int(suffix[5:]), 1))
+    return sorted(months)
+
+
+def create_partition(conn: Connection, month: date):
+    start, end = month_bounds(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE}"
+        f" FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+
+def ensure_partitions(conn: Connection, ahead: Optional[int] = None, today: Optional[date] = None) -> List[date]:
+    """Create partitions for the current month and `ahead` following months; returns the months created"""
+    ahead = settings.GAME_SESSION_PARTITIONS_AHEAD if ahead is None else ahead
+    current = month_floor(today or datetime.now(timezone.utc).date())
+    existing = set(list_partitions(conn))
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_partition(conn, month)
+            created.append(month)
+    return created
+
+
+def convert_to_partitioned(conn: Connection, ahead: Optional[int] = None) -> int:
+    """
+    Replace an ordinary game_sessions table with a partitioned one holding the same rows.
+    Runs inside the caller's transaction and locks the table for its duration.
+    Returns the number of rows copied.
+    """
+    old_table = f"{PARENT_TABLE}_unpartitioned"
+    conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {old_table}"))
+    conn.execute(text(f"ALTER TABLE {old_table} RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {old_table}_pkey"))
+    for index in GameSession.__table__.indexes:
+        conn.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+
+    conn.execute(text(
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {old_table} INCLUDING DEFAULTS)"
+        f" PARTITION BY RANGE (created_at)"
+    ))
+    # Keep the id sequence alive when the old table is dropped
+    conn.execute(text(f"ALTER SEQUENCE {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+    conn.execute(text(f"UPDATE {old_table} SET created_at = now() WHERE created_at IS NULL"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN created_at SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, created_at)"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+    for index in GameSession.__table__.indexes:
+        conn.execute(CreateIndex(index))
+
+    oldest = conn.scalar(text(f"SELECT min(created_at) FROM {old_table}"))
+    month = month_floor(oldest.date()) if oldest else month_floor(datetime.now(timezone.utc).date())
+    current = month_floor(datetime.now(timezone.utc).date())
+    while month < current:
+        create_partition(conn, month)
+        month = add_months(month, 1)
+    ensure_partitions(conn, ahead)
+    # Safety net for rows outside every monthly range (should stay empty)
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    copied = conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {old_table}")).rowcount
+    conn.execute(text(f"DROP TABLE {old_table}"))
+    return copied
+
+
+def archivable_months(conn: Connection, retention_months: Optional[int] = None, today: Optional[date] = None) -> List[date]:
+    """Partitioned months that end before the retention window"""
+    retention_months = settings.GAME_SESSION_RETENTION_MONTHS if retention_months is None else retention_months
+    cutoff = add_months(month_floor(today or datetime.now(timezone.utc).date()), -retention_months)
+    return [month for month in list_partitions(conn) if month < cutoff]
+
+
+def archive_partition(conn: Connection, month: date) -> Tuple[str, int]:
+    """
+    Write one month to its archive file, then detach and drop the partition.
+    The file is complete on disk before the DROP; if the transaction fails the
+    rows are still in the table and rerunning overwrites the file.
+    """
+    start, end = month_bounds(month)
+    path = archive_path(month)
+    count = write_session_archive(conn, start, end, path)
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition_name(month)}"))
+    conn.execute(text(f"DROP TABLE {partition_name(month)}"))
+    return path, count
+
+
+async def maintain_partitions() -> List[date]:
+    """Create missing upcoming monthly partitions (no-op unless game_sessions is partitioned)"""
+    async with get_async_engine().begin() as conn:
+        if not await conn.run_sync(is_partitioned):
+            return []
+        created = await conn.run_sync(ensure_partitions)
+    if created:
+        print(f"Created game_sessions partitions: {', '.join(partition_name(m) for m in created)}")
+    return created
+
+
+# Keeps upcoming monthly partitions created while the app runs
+partition_maintenance = PeriodicTask("Partition maintenance", maintain_partitions, interval=6 * 3600)
@@ -0,0 +1,57 @@
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.core.ttl_cache import TTLCache
+from app.models.database_models import User
+
+
+class PrincipalCache(TTLCache):
+    """
+    Bounded per-worker LRU of authenticated users with a short TTL.
+    Entries are detached copies of User rows, safe to share between requests.
+    """
+
+    size_setting = "PRINCIPAL_CACHE_SIZE"
+    ttl_setting = "PRINCIPAL_CACHE_TTL_SECONDS"
+
+    def get(self, user_id: int) -> Optional[User]:
+        return self.lookup(user_id)
+
+    def put(self, user: User) -> User:
+        principal = snapshot_user(user)
+        self.store(principal.id, principal)
+        return principal
+
+
+def snapshot_user(user: User) -> User:
+    """Copy a User's column values into a new, session-less instance"""
+    return User(**{
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+    })
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    """Drop cached principals whenever a user row changes (role, is_active, ...)"""
+    principal_cache.invalidate(target.id)
+    # This runs at flush, before commit: a concurrent request can still read and
+    # cache the old row until then, so drop the user again once the change commits
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("changed_principals", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    for user_id in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_principals(session):
+    session.info.pop("changed_principals", None)
@@ -0,0 +1,88 @@
+import random
+from functools import lru_cache
+from typing import List, Optional
+from app.core.config import settings
+from app.models.database_models import DifficultyLevel
+
+# Game parameters per difficulty level
+DIFFICULTY_CONFIGS = {
+    DifficultyLevel.EASY: {
+        "min_value": 1,
+        "max_value": 10,
+        "target_range": (5, 20),
+        "max_addends": 3,
+        "hints_enabled": True
+    },
+    DifficultyLevel.MEDIUM: {
+        "min_value": 1,
+        "max_value": 20,
+        "target_range": (10, 50),
+        "max_addends": 4,
+        "hints_enabled": True
+    },
+    DifficultyLevel.HARD: {
+        "min_value": 1,
+        "max_value": 50,
+        "target_range": (20, 100),
+        "max_addends": 5,
+        "hints_enabled": False
+    }
+}
+
+
+def count_decompositions(max_target: int, max_addends: int, min_value: int, max_value: int) -> List[int]:
+    """
+    For every target 0..max_target, the number of ways to write it as an
+    unordered sum of 1..max_addends values in [min_value, max_value].
+    """
+    # ways[parts][total] = multisets of exactly `parts` values summing to `total`
+    ways = [[0] * (max_target + 1) for _ in range(max_addends + 1)]
+    ways[0][0] = 1
+    for value in range(min_value, min(max_value, max_target) + 1):
+        # Ascending part counts reuse this pass's results, allowing repeated values
+        for parts in range(1, max_addends + 1):
+            previous, current = ways[parts - 1], ways[parts]
+            for total in range(value, max_target + 1):
+                current[total] += previous[total - value]
+    return [sum(ways[parts][total] for parts in range(1, max_addends + 1)) for total in range(max_target + 1)]
+
+
+class PuzzleBank:
+    """
+    Targets for one difficulty level with their decomposition counts.
+    Targets are split into `tiers` buckets: tier 1 has the most solutions
+    (easiest), the last tier the fewest.
+    """
+
+    def __init__(self, difficulty: DifficultyLevel, tiers: int):
+        config = DIFFICULTY_CONFIGS[difficulty]
+        low, high = config["target_range"]
+        counts = count_decompositions(high, config["max_addends"], config["min_value"], config["max_value"])
+        self.difficulty = difficulty
+        self.solution_counts = {target: counts[target] for target in range(low, high + 1)}
+        self.targets = list(self.solution_counts)
+
+        by_ease = sorted(self.targets, key=lambda t: (-self.solution_counts[t], t))
+        tiers = max(1, min(tiers, len(by_ease)))
+        self.tiers = [
+            by_ease[len(by_ease) * i // tiers:len(by_ease) * (i + 1) // tiers]
+            for i in range(tiers)
+        ]
+
+    def sample(self, tier: Optional[int] = None) -> int:
+        """Pick a target, optionally restricted to a tier (1-based, clamped)"""
+        if tier is None:
+            return random.choice(self.targets)
+        return random.choice(self.tiers[min(max(tier, 1), len(self.tiers)) - 1])
+
+
+@lru_cache(maxsize=None)
+def get_puzzle_bank(difficulty: DifficultyLevel) -> PuzzleBank:
+    """Build (once per worker) the puzzle bank for a difficulty level"""
+    return PuzzleBank(difficulty, settings.PUZZLE_TIERS)
+
+
+def build_puzzle_banks():
+    """Precompute every difficulty's bank, e.g. at startup"""
+    for difficulty in DifficultyLevel:
+        get_puzzle_bank(difficulty)
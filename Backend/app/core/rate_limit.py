@@ -0,0 +1,161 @@
+import ipaddress
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from app.core.config import settings
+from app.core.security_db import get_current_user_from_token
+from app.models.database_models import User
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets. Subclass and assign to `rate_limiter.backend`
+    to share buckets between workers (e.g. a Redis script with the same semantics).
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """
+        Take `cost` tokens from the bucket for key; return 0 if allowed, else
+        seconds until the request would be allowed. A request costing more than
+        `burst` is allowed once the bucket is full and leaves it in debt.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-worker token buckets: one small tuple per active key.
+    Keys are kept in last-use order; a bucket untouched for long enough to
+    refill completely is indistinguishable from a missing one and is evicted.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        # None = read RATE_LIMIT_MAX_KEYS on use
+        self._max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_keys(self) -> int:
+        return self._max_keys if self._max_keys is not None else settings.RATE_LIMIT_MAX_KEYS
+
+    async def acquire(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+
+            needed = min(cost, burst)
+            retry_after = 0.0
+            if tokens >= needed:
+                tokens -= cost
+            else:
+                retry_after = (needed - tokens) / rate
+            # Third field: when the bucket will be full again and the entry can go
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+
+            self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float):
+        # Least recently used first; stop at the first bucket that is still refilling
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and full_at > now:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+def route_limits() -> dict:
+    """Bucket name -> (tokens per second, burst)"""
+    return {
+        "register:ip": (settings.RATE_LIMIT_REGISTER_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+        "login:ip": (settings.RATE_LIMIT_LOGIN_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+        "login:email": (settings.RATE_LIMIT_LOGIN_EMAIL_PER_MINUTE / 60, settings.RATE_LIMIT_AUTH_BURST),
+        "google:ip": (settings.RATE_LIMIT_LOGIN_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+        "submit:user": (settings.RATE_LIMIT_SUBMIT_PER_MINUTE / 60, settings.RATE_LIMIT_SUBMIT_BURST)
+    }
+
+
+class RateLimiter:
+    """Applies the per-route limits from settings to a pluggable backend"""
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.rejected = 0
+
+    async def check(self, bucket: str, identity, cost: int = 1):
+        """Raise 429 if the bucket for this identity cannot cover `cost` requests"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        rate, burst = route_limits()[bucket]
+        retry_after = await self.backend.acquire(f"{bucket}:{identity}", rate, burst, cost)
+        if retry_after:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please slow down",
+                headers={"Retry-After": str(max(int(retry_after + 0.999), 1))}
+            )
+
+
+rate_limiter = RateLimiter(InMemoryRateLimitBackend())
+
+
+@lru_cache(maxsize=4)
+def trusted_proxy_networks(spec: str) -> Tuple:
+    return tuple(ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip())
+
+
+def is_trusted_proxy(address: str, networks: Tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Socket peer, or, when the peer is a trusted proxy, the right-most
+    X-Forwarded-For address that is not itself a trusted proxy.
+    Entries left of that are client-supplied and never used.
+    """
+    peer = request.client.host if request.client else "unknown"
+    networks = trusted_proxy_networks(settings.RATE_LIMIT_TRUSTED_PROXIES)
+    if not networks or not is_trusted_proxy(peer, networks):
+        return peer
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    for address in reversed([part.strip() for part in forwarded.split(",") if part.strip()]):
+        if not is_trusted_proxy(address, networks):
+            return address
+    return peer
+
+
+def limit_by_ip(bucket: str):
+    """Dependency that rate limits the route by client IP"""
+    async def dependency(request: Request):
+        await rate_limiter.check(bucket, client_ip(request))
+    return dependency
+
+
+def limit_by_user(bucket: str):
+    """Dependency that rate limits the route by authenticated user id"""
+    async def dependency(current_user: User = Depends(get_current_user_from_token)):
+        await rate_limiter.check(bucket, current_user.id)
+    return dependency
@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.firebase import verify_firebase_token, get_user_by_uid
+from app.core.firebase import verify_firebase_token_async, get_user_by_uid
 from typing import Optional
 
 security = HTTPBearer()
@@ -13,7 +13,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     token = credentials.credentials
 
     # Verify Firebase token
-    decoded_token = verify_firebase_token(token)
+    decoded_token = await verify_firebase_token_async(token)
 
     if not decoded_token:
         raise HTTPException(
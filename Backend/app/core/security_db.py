@@ -1,15 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.auth_utils import decode_access_token
+from app.core.principal_cache import principal_cache
 from app.models.database_models import User
 
 security = HTTPBearer()
 
 async def get_current_user_from_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Dependency to get current authenticated user from JWT token
@@ -34,14 +36,19 @@ async def get_current_user_from_token(
             detail="Invalid token payload"
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Get user from the principal cache, falling back to the database
+    user = principal_cache.get(int(user_id))
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    if user is None:
+        user = await db.scalar(select(User).where(User.id == int(user_id)))
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        user = principal_cache.put(user)
     
     if not user.is_active:
         raise HTTPException(
@@ -0,0 +1,191 @@
+import asyncio
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.database_models import ClassEnrollment, GameSession
+
+EXPORT_COLUMNS = [
+    "id",
+    "user_id",
+    "difficulty",
+    "target_number",
+    "user_answer",
+    "is_correct",
+    "attempts",
+    "time_spent_seconds",
+    "score",
+    "created_at"
+]
+
+EXPORT_BATCH_SIZE = 1000
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ARCHIVE_PATTERN = re.compile(r"game_sessions_(\d{4})_(\d{2})\.ndjson\.gz$")
+
+
+def _to_record(row) -> dict:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record["difficulty"] = record["difficulty"].value
+    record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+    return record
+
+
+async def iter_session_records(
+    user_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Yield matching game sessions as lists of plain dicts, EXPORT_BATCH_SIZE at a time.
+    Rows are read through a server-side cursor, so memory use does not depend
+    on the size of the export. Months moved out of the table by the archival
+    command are read back from their archive files. Opens its own session
+    because it outlives the request's dependencies when used from a
+    StreamingResponse.
+    """
+    query = select(*(getattr(GameSession, column) for column in EXPORT_COLUMNS))
+    if user_id is not None:
+        query = query.where(GameSession.user_id == user_id)
+    if teacher_id is not None:
+        query = query.where(GameSession.user_id.in_(
+            select(ClassEnrollment.student_id).where(ClassEnrollment.teacher_id == teacher_id)
+        ))
+    if start is not None:
+        query = query.where(GameSession.created_at >= start)
+    if end is not None:
+        query = query.where(GameSession.created_at < end)
+    query = query.order_by(GameSession.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        # Archived months are older than anything still in the table, so they go first
+        months = archived_months(start, end)
+        if months:
+            user_ids = None
+            if teacher_id is not None:
+                user_ids = set(await db.scalars(
+                    select(ClassEnrollment.student_id).where(ClassEnrollment.teacher_id == teacher_id)
+                ))
+            if user_id is not None:
+                user_ids = {user_id} if user_ids is None or user_id in user_ids else set()
+            batches = iter_archived_records(months, user_ids, start, end)
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                yield batch
+
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield [_to_record(row) for row in partition]
+
+
+def archive_dir() -> str:
+    """GAME_SESSION_ARCHIVE_DIR; a relative path is taken from the Backend directory, not the cwd"""
+    return os.path.join(BACKEND_DIR, settings.GAME_SESSION_ARCHIVE_DIR)
+
+
+def archive_path(month: date) -> str:
+    """Archive file for the game sessions of one calendar month"""
+    return os.path.join(archive_dir(), f"game_sessions_{month:%Y_%m}.ndjson.gz")
+
+
+def archived_months(start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[date]:
+    """Months with an archive file that overlap [start, end), oldest first"""
+    months = []
+    for path in glob.glob(os.path.join(archive_dir(), "game_sessions_*.ndjson.gz")):
+        match = ARCHIVE_PATTERN.search(path)
+        if match is None:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        if start is not None and _as_utc(datetime(next_month.year, next_month.month, 1)) <= _as_utc(start):
+            continue
+        if end is not None and _as_utc(datetime(month.year, month.month, 1)) >= _as_utc(end):
+            continue
+        months.append(month)
+    return sorted(months)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def iter_archived_records(
+    months: List[date],
+    user_ids: Optional[Set[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Iterator[List[dict]]:
+    """Read archived sessions (in export record format), EXPORT_BATCH_SIZE at a time"""
+    batch = []
+    for month in months:
+        with gzip.open(archive_path(month), "rt", encoding="utf-8") as archive:
+            for line in archive:
+                record = json.loads(line)
+                if user_ids is not None and record["user_id"] not in user_ids:
+                    continue
+                if start is not None or end is not None:
+                    created_at = _as_utc(datetime.fromisoformat(record["created_at"]))
+                    if start is not None and created_at < _as_utc(start):
+                        continue
+                    if end is not None and created_at >= _as_utc(end):
+                        continue
+                batch.append(record)
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def write_session_archive(conn: Connection, start: datetime, end: datetime, path: str) -> int:
+    """
+    Write every game session in [start, end) to a gzipped NDJSON file (export record format).
+    Writes to a temporary file and renames it into place, so a crash never leaves a partial archive.
+    """
+    query = (
+        select(*(getattr(GameSession, column) for column in EXPORT_COLUMNS))
+        .where(GameSession.created_at >= start, GameSession.created_at < end)
+        .order_by(GameSession.id)
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = path + ".partial"
+    count = 0
+    with gzip.open(partial, "wt", encoding="utf-8") as archive:
+        result = conn.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            archive.write("".join(json.dumps(_to_record(row), separators=(",", ":")) + "\n" for row in partition))
+            count += len(partition)
+    os.replace(partial, path)
+    return count
+
+
+async def stream_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    """One JSON object per line"""
+    async for batch in batches:
+        yield "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch)
+
+
+async def stream_csv(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    """CSV with a header row; user_answer is written as a JSON array"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in batch:
+            record["user_answer"] = json.dumps(record["user_answer"]) if record["user_answer"] is not None else ""
+            writer.writerow([record[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
@@ -0,0 +1,85 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy import event, func, inspect, select
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.models.database_models import SystemCounter, User, UserDailyScore, UserRole
+
+USERS_TOTAL = "users_total"
+
+
+def role_counter(role: UserRole) -> str:
+    return f"users_role:{UserRole(role).value}"
+
+
+def counter_increment(db, deltas: Dict[str, int]):
+    """
+    Statement and parameters adding `deltas` to named counters.
+    Execute on the session/connection of the transaction being counted.
+    """
+    stmt = upsert_insert(db, SystemCounter.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SystemCounter.name],
+        set_={"value": SystemCounter.value + stmt.excluded.value}
+    )
+    return stmt, [{"name": name, "value": value} for name, value in deltas.items() if value]
+
+
+@event.listens_for(User, "after_insert")
+def _count_new_user(mapper, connection, target):
+    stmt, params = counter_increment(connection, {USERS_TOTAL: 1, role_counter(target.role or UserRole.USER): 1})
+    connection.execute(stmt, params)
+
+
+@event.listens_for(User, "after_update")
+def _count_role_change(mapper, connection, target):
+    history = inspect(target).attrs.role.history
+    if history.added and history.deleted and history.added[0] != history.deleted[0]:
+        stmt, params = counter_increment(connection, {
+            role_counter(history.deleted[0]): -1,
+            role_counter(history.added[0]): 1
+        })
+        connection.execute(stmt, params)
+
+
+@event.listens_for(User, "after_delete")
+def _count_deleted_user(mapper, connection, target):
+    stmt, params = counter_increment(connection, {USERS_TOTAL: -1, role_counter(target.role): -1})
+    connection.execute(stmt, params)
+
+
+# (expires_at, snapshot) of the last /api/admin/stats read in this worker
+_snapshot = (0.0, None)
+
+
+async def get_stats_snapshot(db) -> dict:
+    """Current counters, at most ADMIN_STATS_MAX_STALENESS_SECONDS old"""
+    global _snapshot
+    expires_at, snapshot = _snapshot
+    if snapshot is not None and expires_at > time.monotonic():
+        return snapshot
+
+    roles = {role: role_counter(role) for role in UserRole}
+    names = [USERS_TOTAL, *roles.values()]
+    values = dict((await db.execute(
+        select(SystemCounter.name, SystemCounter.value).where(SystemCounter.name.in_(names))
+    )).all())
+    # Summed from the per-user daily rollup rather than a shared counter row,
+    # which every game insert in every worker would otherwise serialize on
+    games_today = await db.scalar(
+        select(func.coalesce(func.sum(UserDailyScore.games), 0))
+        .where(UserDailyScore.day == datetime.now(timezone.utc).date())
+    )
+
+    snapshot = {
+        "total_users": values.get(USERS_TOTAL, 0),
+        "total_students": values.get(roles[UserRole.STUDENT], 0),
+        "total_teachers": values.get(roles[UserRole.TEACHER], 0),
+        "total_admins": values.get(roles[UserRole.ADMIN], 0),
+        "total_basic_users": values.get(roles[UserRole.USER], 0),
+        "games_played_today": games_today,
+        "as_of": datetime.now(timezone.utc).isoformat()
+    }
+    _snapshot = (time.monotonic() + settings.ADMIN_STATS_MAX_STALENESS_SECONDS, snapshot)
+    return snapshot
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU whose entries expire after a TTL.
+    Subclasses name the settings that size it (`size_setting`, `ttl_setting`);
+    sizes passed to the constructor take precedence.
+    """
+
+    size_setting: Optional[str] = None
+    ttl_setting: Optional[str] = None
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        # None = read the subclass's settings on use
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size if self._max_size is not None else getattr(settings, self.size_setting)
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds if self._ttl_seconds is not None else getattr(settings, self.ttl_setting)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key: Hashable) -> Optional[Any]:
+        """Cached value for `key`, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def store(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Cache `value` for `ttl_seconds` (default: the cache's TTL), evicting the least recently used"""
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
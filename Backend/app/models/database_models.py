@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Enum, Float, ForeignKey, Index, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -36,6 +36,8 @@ class User(Base):
 
     # Relationships
     game_sessions = relationship("GameSession", back_populates="user", cascade="all, delete-orphan")
+    game_stats = relationship("UserGameStats", cascade="all, delete-orphan")
+    daily_scores = relationship("UserDailyScore", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -57,6 +59,93 @@ class GameSession(Base):
     # Relationships
     user = relationship("User", back_populates="game_sessions")
 
+    __table_args__ = (
+        # Serves per-user history in created_at order and keyset pagination
+        Index("ix_game_sessions_user_created_id", "user_id", created_at.desc(), id.desc()),
+    )
+
     def __repr__(self):
         return f"<GameSession {self.id} - User {self.user_id}>"
 
+
+class UserGameStats(Base):
+    """Per-user, per-difficulty rollup maintained alongside every GameSession insert"""
+    __tablename__ = "user_game_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    difficulty = Column(Enum(DifficultyLevel), primary_key=True)
+    played = Column(Integer, default=0, nullable=False)
+    correct = Column(Integer, default=0, nullable=False)
+    total_score = Column(Integer, default=0, nullable=False)
+    time_sum = Column(Integer, default=0, nullable=False)  # Only sessions with time data
+    time_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserGameStats User {self.user_id} - {self.difficulty}>"
+
+class UserDailyScore(Base):
+    """Per-user score totals by UTC day; source for rebuilding leaderboards"""
+    __tablename__ = "user_daily_scores"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    score = Column(Integer, default=0, nullable=False)
+    games = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<UserDailyScore User {self.user_id} - {self.day}>"
+
+class UserDataVersion(Base):
+    """Per-user counter bumped whenever the user's game data changes; used as the ETag for progress/history"""
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<UserDataVersion User {self.user_id} - v{self.version}>"
+
+class ClassEnrollment(Base):
+    """Membership of a student in a teacher's class"""
+    __tablename__ = "class_enrollments"
+
+    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ClassEnrollment Teacher {self.teacher_id} - Student {self.student_id}>"
+
+class ClassInvite(Base):
+    """Pending invitation of a student to a teacher's class; becomes a ClassEnrollment once the student accepts"""
+    __tablename__ = "class_invites"
+
+    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ClassInvite Teacher {self.teacher_id} - Student {self.student_id}>"
+
+class SystemCounter(Base):
+    """Named counters kept up to date transactionally (users in total and per role)"""
+    __tablename__ = "system_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<SystemCounter {self.name}={self.value}>"
+
+class SubmitIdempotencyKey(Base):
+    """Idempotency-Key of an accepted /api/game/submit; the primary key rejects a second insert"""
+    __tablename__ = "submit_idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(64), primary_key=True)
+    session_id = Column(Integer, nullable=False)  # game_sessions.id (no FK so game_sessions can be partitioned)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<SubmitIdempotencyKey User {self.user_id} - {self.key}>"
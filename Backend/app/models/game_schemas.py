@@ -10,6 +10,7 @@ class DifficultyLevel(str, Enum):
 
 class GameConfigRequest(BaseModel):
     difficulty: DifficultyLevel
+    tier: Optional[int] = Field(None, ge=1)  # 1 = most solutions; higher tiers have fewer
 
 class GameConfigResponse(BaseModel):
     target_number: int
@@ -18,6 +19,12 @@ class GameConfigResponse(BaseModel):
     max_value: int
     max_addends: int
     hints_enabled: bool
+    solution_count: Optional[int] = None
+
+def validate_addends(v: List[int]) -> List[int]:
+    if not all(isinstance(x, int) and x > 0 for x in v):
+        raise ValueError('All addends must be positive integers')
+    return v
 
 class SubmitAnswerRequest(BaseModel):
     target_number: int
@@ -25,11 +32,21 @@ class SubmitAnswerRequest(BaseModel):
     difficulty: DifficultyLevel
     time_spent_seconds: Optional[int] = None
 
-    @validator('user_answer')
-    def validate_answer(cls, v):
-        if not all(isinstance(x, int) and x > 0 for x in v):
-            raise ValueError('All addends must be positive integers')
-        return v
+    _validate_answer = validator('user_answer', allow_reuse=True)(validate_addends)
+
+class HintRequest(BaseModel):
+    target_number: int = Field(..., gt=0)
+    user_answer: List[int] = Field(default_factory=list, max_items=10)
+    difficulty: DifficultyLevel
+
+    _validate_answer = validator('user_answer', allow_reuse=True)(validate_addends)
+
+class HintResponse(BaseModel):
+    action: str  # "add", "remove", "reset" or "done"
+    value: Optional[int]
+    remaining: int
+    solvable: bool
+    message: str
 
 class SubmitAnswerResponse(BaseModel):
     is_correct: bool
@@ -40,6 +57,12 @@ class SubmitAnswerResponse(BaseModel):
     score: int
     session_id: int
 
+class BatchSubmitRequest(BaseModel):
+    answers: List[SubmitAnswerRequest] = Field(..., min_items=1, max_items=100)
+
+class BatchSubmitResponse(BaseModel):
+    results: List[SubmitAnswerResponse]
+
 class GameProgressResponse(BaseModel):
     total_games: int
     correct_games: int
@@ -63,3 +86,28 @@ class GameSessionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class LeaderboardWindow(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    ALL_TIME = "all_time"
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    display_name: Optional[str]
+    score: int
+
+class LeaderboardRank(BaseModel):
+    rank: int
+    score: int
+
+class LeaderboardResponse(BaseModel):
+    window: LeaderboardWindow
+    total_players: int
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardRank]
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
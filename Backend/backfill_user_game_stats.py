@@ -0,0 +1,83 @@
+"""
+Rebuild the user_game_stats, user_daily_scores and system_counters rollup
+tables from users and game_sessions, and bump every user's data version so
+cached progress/history responses (ETags) are revalidated.
+Run this once after creating the tables, or any time the rollups drift.
+"""
+from sqlalchemy import case, delete, func, insert, select
+from app.core.database import get_engine, upsert_insert
+from app.models.database_models import Base, GameSession, SystemCounter, User, UserDailyScore, UserDataVersion, UserGameStats
+from app.core.system_counters import USERS_TOTAL, role_counter
+
+def main():
+    """Recompute every rollup in one transaction"""
+    print("Backfilling user_game_stats, user_daily_scores and system_counters...")
+    try:
+        Base.metadata.create_all(
+            bind=get_engine(),
+            tables=[UserGameStats.__table__, UserDailyScore.__table__, SystemCounter.__table__, UserDataVersion.__table__]
+        )
+
+        has_time = GameSession.time_spent_seconds > 0
+        aggregated = select(
+            GameSession.user_id,
+            GameSession.difficulty,
+            func.count(),
+            func.sum(case((GameSession.is_correct, 1), else_=0)),
+            func.coalesce(func.sum(GameSession.score), 0),
+            func.sum(case((has_time, GameSession.time_spent_seconds), else_=0)),
+            func.sum(case((has_time, 1), else_=0))
+        ).group_by(GameSession.user_id, GameSession.difficulty)
+
+        with get_engine().begin() as conn:
+            # Days are UTC, as in record_daily_scores. date() on a timestamptz would use
+            # the session time zone; SQLite already stores CURRENT_TIMESTAMP in UTC
+            created_at = GameSession.created_at
+            if conn.dialect.name != "sqlite":
+                created_at = func.timezone("UTC", created_at)
+            day = func.date(created_at)
+            daily = select(
+                GameSession.user_id,
+                day,
+                func.coalesce(func.sum(GameSession.score), 0),
+                func.count()
+            ).group_by(GameSession.user_id, day)
+
+            conn.execute(delete(UserGameStats))
+            result = conn.execute(
+                insert(UserGameStats).from_select(
+                    ["user_id", "difficulty", "played", "correct", "total_score", "time_sum", "time_count"],
+                    aggregated
+                )
+            )
+            conn.execute(delete(UserDailyScore))
+            daily_result = conn.execute(
+                insert(UserDailyScore).from_select(["user_id", "day", "score", "games"], daily)
+            )
+
+            counters = {}
+            for role, count in conn.execute(select(User.role, func.count()).group_by(User.role)):
+                counters[role_counter(role)] = count
+                counters[USERS_TOTAL] = counters.get(USERS_TOTAL, 0) + count
+            conn.execute(delete(SystemCounter))
+            if counters:
+                conn.execute(insert(SystemCounter), [{"name": name, "value": value} for name, value in counters.items()])
+
+            user_ids = list(conn.scalars(select(User.id)))
+            if user_ids:
+                bump = upsert_insert(conn, UserDataVersion.__table__)
+                bump = bump.on_conflict_do_update(
+                    index_elements=[UserDataVersion.user_id],
+                    set_={"version": UserDataVersion.version + 1}
+                )
+                conn.execute(bump, [{"user_id": user_id, "version": 1} for user_id in user_ids])
+        print(f"✅ Backfilled {result.rowcount} user_game_stats rows")
+        print(f"✅ Backfilled {daily_result.rowcount} user_daily_scores rows")
+        print(f"✅ Backfilled {len(counters)} system_counters rows")
+        print(f"✅ Bumped data versions of {len(user_ids)} users")
+    except Exception as e:
+        print(f"❌ Error backfilling stats: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
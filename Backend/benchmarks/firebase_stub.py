@@ -0,0 +1,122 @@
+"""
+Local stand-in for Google's Firebase ID token signing certificates.
+
+Serves a self-signed certificate in the same JSON format and with the same
+Cache-Control header as the real endpoint, and mints ID tokens signed with
+the matching key. Point FIREBASE_CERTS_URL at it to exercise Google sign-in
+without network access:
+
+    python benchmarks/firebase_stub.py --port 8765 --project-id demo
+    FIREBASE_CERTS_URL=http://127.0.0.1:8765/ uvicorn main:app
+"""
+import argparse
+import datetime
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+
+class FirebaseStub:
+    """Signing key, certificate endpoint and token minting for one fake project"""
+
+    def __init__(self, project_id: str, max_age: int = 3600):
+        self.project_id = project_id
+        self.max_age = max_age
+        self.kid = uuid.uuid4().hex
+        self.fetch_count = 0
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "firebase-stub")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=5))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        self.private_key_pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        self.certs = {self.kid: cert.public_bytes(serialization.Encoding.PEM).decode()}
+        self._server = None
+
+    def mint_token(self, uid: str, email: str, name: str = None, expires_in: int = 3600) -> str:
+        """Create a Firebase-style ID token signed by the stub key"""
+        now = int(time.time())
+        claims = {
+            "iss": f"https://securetoken.google.com/{self.project_id}",
+            "aud": self.project_id,
+            "sub": uid,
+            "user_id": uid,
+            "auth_time": now,
+            "iat": now,
+            "exp": now + expires_in,
+            "email": email,
+            "email_verified": True,
+            "name": name or email.split("@")[0]
+        }
+        return jwt.encode(claims, self.private_key_pem, algorithm="RS256", headers={"kid": self.kid})
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve the certificates in a background thread and return their URL"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.fetch_count += 1
+                body = json.dumps(stub.certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={stub.max_age}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/"
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub Firebase signing certificates")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--project-id", default="demo")
+    parser.add_argument("--max-age", type=int, default=3600)
+    args = parser.parse_args()
+
+    stub = FirebaseStub(args.project_id, args.max_age)
+    url = stub.serve(args.host, args.port)
+    print(f"Serving certificates at {url}")
+    print(f"Sample token: {stub.mint_token('stub-user', 'stub-user@example.com')}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold-start import profile of the API (`python -X importtime -c "import main"`).
+
+    python benchmarks/import_time.py --runs 5 --max-ms 2500
+
+Runs the import in fresh interpreters with an empty environment (importing
+main must not need settings, a database or Firebase), keeps the fastest run
+and prints the total plus the slowest modules as JSON. Exits non-zero when
+the total exceeds --max-ms or when a module that should load lazily (see
+--forbid) is imported, so it can be used as a regression check.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Modules that must only be imported on first use, never by `import main`
+DEFAULT_FORBIDDEN = ["firebase_admin", "psycopg", "aiosqlite"]
+
+
+def profile_import() -> dict:
+    """Return {module: (self_us, cumulative_us)} for one cold `import main`"""
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"`import main` failed:\n{completed.stderr[-2000:]}")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of main.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN)
+    args = parser.parse_args()
+
+    runs = [profile_import() for _ in range(args.runs)]
+    best = min(runs, key=lambda modules: modules["main"][1])
+    total_ms = best["main"][1] / 1000
+
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    forbidden = sorted(name for name in best if name.split(".")[0] in args.forbid)
+
+    report = {
+        "total_ms": round(total_ms, 1),
+        "modules": len(best),
+        "slowest_self_ms": {name: round(self_us / 1000, 2) for name, (self_us, _) in slowest},
+        "forbidden_imported": forbidden
+    }
+    print(json.dumps(report, indent=2))
+
+    failed = bool(forbidden)
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds {args.max_ms} ms", file=sys.stderr)
+        failed = True
+    if forbidden:
+        print(f"Modules imported eagerly: {', '.join(forbidden)}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark the in-process leaderboard index with synthetic players.
+
+    python benchmarks/leaderboard_bench.py --players 1000000
+
+Reports build time, per-operation cost of score updates, top-N and
+"my rank" queries, as JSON, for uniformly spread scores and for
+realistic tie-heavy scores (multiples of 5 in a narrow band).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.core.leaderboard import ScoreIndex
+
+
+def timed(operation, count: int) -> float:
+    """Average microseconds per call of operation(i) over `count` calls"""
+    started = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaderboard index benchmark")
+    parser.add_argument("--players", type=int, default=1_000_000)
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--max-score", type=int, default=50_000)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # "uniform": spread-out scores; "tied": multiples of 5 in a narrow band, as real
+    # game scores are, so thousands of players share each score
+    datasets = {
+        "uniform": {user_id: rng.randint(0, args.max_score) for user_id in range(args.players)},
+        "tied": {user_id: rng.randint(0, 400) * 5 for user_id in range(args.players)}
+    }
+    user_ids = [rng.randrange(args.players) for _ in range(args.operations)]
+    deltas = [rng.choice((0, 10, 15, 20, 25, 30, 35)) for _ in range(args.operations)]
+
+    result = {"players": args.players}
+    for name, scores in datasets.items():
+        started = time.perf_counter()
+        index = ScoreIndex(scores)
+        build_seconds = time.perf_counter() - started
+
+        result[name] = {
+            "build_seconds": round(build_seconds, 3),
+            "update_us": round(timed(lambda i: index.add(user_ids[i], deltas[i]), args.operations), 2),
+            "rank_us": round(timed(lambda i: index.rank(user_ids[i]), args.operations), 2),
+            f"top{args.top}_us": round(timed(lambda i: index.top(args.top), args.operations // 10), 2),
+            "new_player_us": round(timed(lambda i: index.add(args.players + i, deltas[i]), args.operations), 2),
+            "score_jump_us": round(timed(lambda i: index.add(user_ids[i], 50_000_000), 100), 2)
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
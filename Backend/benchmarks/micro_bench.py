@@ -0,0 +1,207 @@
+"""
+Microbenchmarks for per-request game logic, JWT handling and schema validation.
+
+    python benchmarks/micro_bench.py                    # compare with the stored baseline
+    python benchmarks/micro_bench.py --save-baseline    # record a new baseline
+    python benchmarks/micro_bench.py --filter jwt --threshold 0.5
+
+Each case is timed as the median of several interleaved passes, in
+nanoseconds per call. Results are normalised by a fixed pure-Python
+calibration loop measured the same way, so a baseline stays roughly
+comparable across machines (record it on the machine that runs the check
+for best results). The script exits with status 1 if any case is slower
+than the baseline by more than --threshold (default 25%), so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Only the settings the measured code reads need real values
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("FIREBASE_PROJECT_ID", "bench")
+os.environ.setdefault("FIREBASE_PRIVATE_KEY", "unused")
+os.environ.setdefault("FIREBASE_CLIENT_EMAIL", "bench@bench.iam.gserviceaccount.com")
+os.environ.setdefault("FIREBASE_DATABASE_URL", "https://bench.firebaseio.com")
+os.environ.setdefault("JWT_SECRET", "micro-benchmark-secret")
+
+from pydantic import BaseModel
+
+from app.api.routes.game import calculate_score, generate_game_config, grade_answer
+from app.core.auth_utils import create_access_token, decode_access_token
+from app.models import game_schemas
+from app.models.database_models import DifficultyLevel
+from app.models.game_schemas import SubmitAnswerRequest
+
+CALIBRATION = "_calibration"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro_bench.json")
+
+SUBMIT_PAYLOAD = {"target_number": 17, "user_answer": [8, 9], "difficulty": "medium", "time_spent_seconds": 12}
+SUBMIT_RESPONSE = {
+    "is_correct": True, "user_sum": 17, "target_number": 17, "difference": 0,
+    "feedback": "Perfect! You balanced the scale! 🎉", "score": 25, "session_id": 123456
+}
+
+# One representative payload per schema; every BaseModel in game_schemas must appear here
+SCHEMA_PAYLOADS = {
+    "GameConfigRequest": {"difficulty": "hard", "tier": 2},
+    "GameConfigResponse": {
+        "target_number": 17, "difficulty": "medium", "min_value": 1, "max_value": 20,
+        "max_addends": 4, "hints_enabled": True, "solution_count": 94
+    },
+    "SubmitAnswerRequest": SUBMIT_PAYLOAD,
+    "HintRequest": {"target_number": 17, "user_answer": [8], "difficulty": "medium"},
+    "HintResponse": {"action": "add", "value": 9, "remaining": 9, "solvable": True, "message": "Try adding 9"},
+    "SubmitAnswerResponse": SUBMIT_RESPONSE,
+    "BatchSubmitRequest": {"answers": [SUBMIT_PAYLOAD] * 20},
+    "BatchSubmitResponse": {"results": [SUBMIT_RESPONSE] * 20},
+    "GameProgressResponse": {
+        "total_games": 5231, "correct_games": 4410, "accuracy_percentage": 84.3,
+        "total_score": 97321, "average_time_seconds": 18.4,
+        "difficulty_stats": {"easy": {"played": 3000, "correct": 2800, "accuracy": 93.3}},
+        "recent_sessions": [{"id": 9000 + i, "difficulty": "easy", "score": 15} for i in range(5)]
+    },
+    "GameSessionResponse": {
+        "id": 1, "difficulty": "easy", "target_number": 12, "user_answer": [5, 7], "is_correct": True,
+        "attempts": 1, "time_spent_seconds": 10, "score": 15, "created_at": "2026-10-18T12:00:00"
+    },
+    "LeaderboardEntry": {"rank": 1, "user_id": 42, "display_name": "Ada", "score": 9000},
+    "LeaderboardRank": {"rank": 17, "score": 4200},
+    "LeaderboardResponse": {
+        "window": "weekly", "total_players": 10000,
+        "entries": [{"rank": i + 1, "user_id": i, "display_name": None, "score": 9000 - i} for i in range(10)],
+        "me": {"rank": 17, "score": 4200}
+    }
+}
+
+
+def answer(target: int, values: list) -> SubmitAnswerRequest:
+    return SubmitAnswerRequest(target_number=target, user_answer=values, difficulty="medium", time_spent_seconds=12)
+
+
+def build_cases() -> dict:
+    """Name -> zero-argument callable for every benchmarked operation"""
+    token = create_access_token({"sub": "12345", "email": "bench@example.com", "role": "user"})
+    cases = {
+        "calculate_score.correct": lambda: calculate_score(True, DifficultyLevel.MEDIUM, 12, 1),
+        "calculate_score.incorrect": lambda: calculate_score(False, DifficultyLevel.HARD, 40, 1),
+        "generate_game_config.easy": lambda: generate_game_config(DifficultyLevel.EASY),
+        "generate_game_config.hard_tier": lambda: generate_game_config(DifficultyLevel.HARD, 2),
+        "jwt.encode": lambda: create_access_token({"sub": "12345", "email": "bench@example.com", "role": "user"}),
+        "jwt.decode": lambda: decode_access_token(token)
+    }
+
+    # One case per feedback branch of grade_answer
+    for branch, request in {
+        "correct": answer(17, [8, 9]),
+        "close": answer(17, [8, 8]),
+        "too_heavy": answer(17, [10, 12]),
+        "too_light": answer(17, [3, 4])
+    }.items():
+        cases[f"grade_answer.{branch}"] = lambda request=request: grade_answer(request, 12345)
+
+    schemas = {
+        name: model for name, model in vars(game_schemas).items()
+        if isinstance(model, type) and issubclass(model, BaseModel) and model is not BaseModel
+    }
+    missing = sorted(set(schemas) - set(SCHEMA_PAYLOADS))
+    if missing:
+        raise SystemExit(f"No benchmark payload for schema(s): {', '.join(missing)}")
+    for name, model in schemas.items():
+        payload = SCHEMA_PAYLOADS[name]
+        cases[f"validate.{name}"] = lambda model=model, payload=payload: model.model_validate(payload)
+    return cases
+
+
+def calibration_workload():
+    """Fixed pure-Python workload used to normalise results across machines"""
+    total = 0
+    for i in range(1000):
+        total += i * i
+    return total
+
+
+def autorange(func, target_ns: float = 10_000_000) -> int:
+    """Calls per round so that one round takes roughly target_ns"""
+    number = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        if time.perf_counter_ns() - started >= target_ns / 10 or number >= 1_000_000:
+            return max(number * 10, 1)
+        number *= 10
+
+
+def measure_all(cases: dict, passes: int) -> dict:
+    """
+    Median nanoseconds per call for every case.
+    Passes are interleaved across cases so that a slow stretch on a busy
+    machine affects one sample of every case rather than all samples of one.
+    """
+    numbers = {name: autorange(func) for name, func in cases.items()}
+    samples = {name: [] for name in cases}
+    for _ in range(passes):
+        for name, func in cases.items():
+            number = numbers[name]
+            started = time.perf_counter_ns()
+            for _ in range(number):
+                func()
+            samples[name].append((time.perf_counter_ns() - started) / number)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks with baseline regression check")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction")
+    parser.add_argument("--passes", type=int, default=9, help="Interleaved samples per case")
+    parser.add_argument("--filter", help="Only run cases whose name contains this substring")
+    args = parser.parse_args()
+
+    cases = build_cases()
+    if args.filter:
+        cases = {name: func for name, func in cases.items() if args.filter in name}
+
+    timings = measure_all({**cases, CALIBRATION: calibration_workload}, args.passes)
+    calibration_ns = timings.pop(CALIBRATION)
+    results = {name: round(ns, 1) for name, ns in timings.items()}
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as handle:
+            json.dump({"calibration_ns": round(calibration_ns, 1), "cases_ns": results}, handle, indent=2)
+            handle.write("\n")
+        print(json.dumps({"saved": args.baseline, "cases_ns": results}, indent=2))
+        return
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps({"cases_ns": results}, indent=2))
+        raise SystemExit(f"No baseline at {args.baseline}; run with --save-baseline first")
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    scale = calibration_ns / baseline["calibration_ns"]
+
+    report, regressions = {}, []
+    for name, ns in results.items():
+        old = baseline["cases_ns"].get(name)
+        entry = {"ns": ns}
+        if old:
+            entry["baseline_ns"] = round(old * scale, 1)
+            entry["change_pct"] = round((ns / (old * scale) - 1) * 100, 1)
+            if ns > old * scale * (1 + args.threshold):
+                regressions.append(name)
+        report[name] = entry
+    print(json.dumps({"machine_scale": round(scale, 3), "cases": report, "regressions": regressions}, indent=2))
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-endpoint serialization cost: FastAPI's default response path versus orjson.
+
+    python benchmarks/serialization_bench.py --iterations 20000
+
+"default" mirrors what FastAPI does for a dict returned under a
+response_model: validate through the model, dump to JSON-compatible Python
+and encode with the stdlib json module. "fast" is the FAST_JSON_RESPONSES
+path: orjson.dumps of the already-typed payload.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models.database_models import DifficultyLevel
+from app.models.game_schemas import GameConfigResponse, GameProgressResponse, SubmitAnswerResponse
+
+PAYLOADS = {
+    "/api/game/config": (GameConfigResponse, {
+        "target_number": 17,
+        "difficulty": DifficultyLevel.MEDIUM,
+        "min_value": 1,
+        "max_value": 20,
+        "max_addends": 4,
+        "hints_enabled": True,
+        "solution_count": 94
+    }),
+    "/api/game/submit": (SubmitAnswerResponse, {
+        "is_correct": False,
+        "user_sum": 15,
+        "target_number": 17,
+        "difference": -2,
+        "feedback": "Almost there! Add a bit more.",
+        "score": 0,
+        "session_id": 123456
+    }),
+    "/api/game/progress": (GameProgressResponse, {
+        "total_games": 5231,
+        "correct_games": 4410,
+        "accuracy_percentage": 84.3,
+        "total_score": 97321,
+        "average_time_seconds": 18.4,
+        "difficulty_stats": {
+            "easy": {"played": 3000, "correct": 2800, "accuracy": 93.3},
+            "medium": {"played": 1800, "correct": 1400, "accuracy": 77.7},
+            "hard": {"played": 431, "correct": 210, "accuracy": 48.7}
+        },
+        "recent_sessions": [
+            {"id": 9000 + i, "difficulty": "easy", "target_number": 12, "is_correct": True,
+             "score": 15, "created_at": "2026-10-18T12:00:00+00:00"}
+            for i in range(5)
+        ]
+    })
+}
+
+
+def default_path(adapter: TypeAdapter, payload: dict) -> bytes:
+    content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(payload: dict) -> bytes:
+    return orjson.dumps(payload)
+
+
+def per_call_us(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    for endpoint, (model, payload) in PAYLOADS.items():
+        adapter = TypeAdapter(model)
+        default_us = per_call_us(lambda: default_path(adapter, payload), args.iterations)
+        fast_us = per_call_us(lambda: fast_path(payload), args.iterations)
+        results[endpoint] = {
+            "default_us": round(default_us, 2),
+            "fast_us": round(fast_us, 2),
+            "speedup": round(default_us / fast_us, 1)
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Concurrency check for /api/game/submit with a small connection pool.
+
+Fires more simultaneous submits than the pool can hold (DB_POOL_SIZE +
+DB_MAX_OVERFLOW) from users missing from the principal cache, so every
+request also reads its user row, and checks that all of them succeed, with
+and without GAME_SESSION_WRITE_BEHIND:
+
+    python benchmarks/write_behind_check.py --pool-size 2 --max-overflow 2 --requests 40
+
+Runs the app in-process on a throwaway SQLite file. Exits with status 1 if
+any submit fails, so it can gate CI. Requires the development extras
+(`pip install -r requirements-dev.txt`).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+
+from firebase_stub import FirebaseStub
+
+PAYLOAD = {"target_number": 12, "user_answer": [5, 7], "difficulty": "easy", "time_spent_seconds": 10}
+
+
+def configure(args, database_path: str, stub: FirebaseStub, stub_url: str):
+    """Settings are read on first use, so they must be in the environment before the app is imported"""
+    os.environ.update({
+        "FIREBASE_CERTS_URL": stub_url,
+        "FIREBASE_PROJECT_ID": stub.project_id,
+        "DATABASE_URL": f"sqlite:///{database_path}",
+        "AUTO_CREATE_SCHEMA": "true",
+        "RATE_LIMIT_ENABLED": "false",
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": str(args.max_overflow),
+        "DB_POOL_TIMEOUT": str(args.pool_timeout)
+    })
+    os.environ.setdefault("FIREBASE_PRIVATE_KEY", stub.private_key_pem)
+    os.environ.setdefault("FIREBASE_CLIENT_EMAIL", "check@write-behind-check.iam.gserviceaccount.com")
+    os.environ.setdefault("FIREBASE_DATABASE_URL", "https://write-behind-check.firebaseio.com")
+    os.environ.setdefault("JWT_SECRET", "write-behind-check-secret")
+
+
+async def burst(app, tokens: list, total: int) -> dict:
+    """Send `total` submits at once, rotating over the users"""
+    from app.core.principal_cache import principal_cache
+
+    principal_cache.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=120.0) as client:
+        async def submit(index: int) -> int:
+            headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+            try:
+                return (await client.post("/api/game/submit", json=PAYLOAD, headers=headers)).status_code
+            except Exception:
+                return 500
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(submit(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    counts = {}
+    for code in statuses:
+        counts[str(code)] = counts.get(str(code), 0) + 1
+    return {"statuses": counts, "seconds": round(elapsed, 2)}
+
+
+async def run(args) -> dict:
+    from main import app
+    from app.core.auth_utils import create_access_token
+    from app.core.config import get_settings
+    from app.core.database import AsyncSessionLocal
+    from app.models.database_models import User
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with AsyncSessionLocal() as db:
+            users = [User(email=f"check-{i}@example.com", display_name="Check") for i in range(args.users)]
+            db.add_all(users)
+            await db.commit()
+            tokens = [
+                create_access_token({"sub": str(user.id), "email": user.email, "role": user.role.value})
+                for user in users
+            ]
+
+        for write_behind in (False, True):
+            get_settings().GAME_SESSION_WRITE_BEHIND = write_behind
+            results["write_behind" if write_behind else "direct"] = await burst(app, tokens, args.requests)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-overflow", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--users", type=int, default=10)
+    args = parser.parse_args()
+    if args.requests <= args.pool_size + args.max_overflow:
+        raise SystemExit("--requests must exceed --pool-size + --max-overflow")
+
+    stub = FirebaseStub(project_id="write-behind-check")
+    stub_url = stub.serve()
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            configure(args, os.path.join(scratch, "write_behind_check.db"), stub, stub_url)
+            results = asyncio.run(run(args))
+    finally:
+        stub.shutdown()
+
+    failed = {mode: result for mode, result in results.items() if set(result["statuses"]) != {"200"}}
+    print(json.dumps({"pool": args.pool_size + args.max_overflow, "requests": args.requests,
+                      "results": results, "failed": sorted(failed)}, indent=2))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,25 @@
 Initialize game-related database tables.
 Run this script to create the new GameSession table.
 """
-from app.core.database import init_db, engine
-from app.models.database_models import Base
+from app.core.database import init_db
+from app.models import database_models  # registers the models on Base.metadata
 
 def main():
     """Initialize all database tables"""
     print("Creating database tables...")
     try:
-        Base.metadata.create_all(bind=engine)
+        init_db()
         print("✅ Database tables created successfully!")
         print("   - users table")
-        print("   - game_sessions table (new)")
+        print("   - game_sessions table")
+        print("   - user_game_stats table")
+        print("   - user_daily_scores table")
+        print("   - class_enrollments table")
+        print("   - class_invites table (new)")
+        print("   - system_counters table")
+        print("   - submit_idempotency_keys table")
+        print("   - user_data_versions table")
+        print("   - indexes missing from existing tables")
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
         raise
@@ -1,20 +1,59 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 from app.core.config import settings
-from app.core.firebase import initialize_firebase
-from app.core.database import init_db
+from app.core.firebase import firebase_keys
+from app.core.database import AsyncSessionLocal, get_async_engine, init_db_async, dispose_engines, get_pool_stats
+from app.core.auth_utils import get_hash_pool_stats
+from app.core.game_store import game_session_writer
+from app.core.metrics import MetricsMiddleware, render_prometheus
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import rate_limiter
+from app.core.idempotency import idempotency_cache, idempotency_key_purger
+from app.core.puzzle_bank import build_puzzle_banks
+from app.core.hint_engine import build_hint_engines
+from app.core.leaderboard import leaderboards
+from app.core.partitions import partition_maintenance
 from app.api.routes import auth_db, protected_db, game
 
-# Initialize Firebase (for Google Sign-in only)
-initialize_firebase()
 
-# Initialize Database
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing above runs at import time; workers and tests only pay for startup here.
+    # The Firebase Admin SDK is initialized on first use (Google sign-in verifies
+    # tokens locally), and schema creation is an explicit step (init_game_tables.py)
+    # unless AUTO_CREATE_SCHEMA is set.
+    get_async_engine()
+    if settings.AUTO_CREATE_SCHEMA:
+        await init_db_async()
+
+    build_puzzle_banks()
+    build_hint_engines()
+
+    # Background tasks: signing certificate prefetch/refresh, leaderboard load,
+    # creation of upcoming game_sessions partitions (no-op unless partitioned)
+    # and purging of expired Idempotency-Keys
+    firebase_keys.refresher.start()
+    leaderboards.refresher.start()
+    partition_maintenance.start()
+    idempotency_key_purger.start()
+
+    yield
+
+    await game_session_writer.close()
+    await leaderboards.refresher.stop()
+    await partition_maintenance.stop()
+    await idempotency_key_purger.stop()
+    await firebase_keys.refresher.stop()
+    await dispose_engines()
+
 
 app = FastAPI(
     title="Balance Scale Addition API",
     description="API for Balance Scale Addition Game with PostgreSQL + Firebase Google Auth",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,8 +63,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Per-route latency, DB time and in-flight requests (exposed on /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_db.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(protected_db.router, prefix="/api", tags=["Protected Routes"])
@@ -44,8 +87,50 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(response: Response):
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        database = "connected"
+    except Exception:
+        database = "unavailable"
+        response.status_code = 503
     return {
-        "status": "healthy",
-        "database": "connected"
+        "status": "healthy" if database == "connected" else "degraded",
+        "database": database
+    }
+
+
+@app.get("/metrics/pool")
+async def pool_metrics():
+    """Connection pool usage for the worker serving this request"""
+    return get_pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text-format metrics for the worker serving this request"""
+    pool = get_pool_stats()
+    hashing = get_hash_pool_stats()
+    writer = game_session_writer.stats
+    gauges = {
+        "password_hash_pending": ("gauge", "Password hash jobs queued or running.", hashing["pending"]),
+        "password_hash_rejected_total": ("counter", "Password hash jobs rejected with 503.", hashing["rejected"]),
+        "password_hash_queue_wait_seconds_total": ("counter", "Total time hash jobs waited for a pool thread.", hashing["queue_wait_seconds_total"]),
+        "rate_limit_rejected_total": ("counter", "Requests rejected with 429.", rate_limiter.rejected),
+        "idempotency_replays_total": ("counter", "Submits answered from the idempotency cache.", idempotency_cache.hits),
+        "principal_cache_hits_total": ("counter", "Authenticated user cache hits.", principal_cache.hits),
+        "principal_cache_misses_total": ("counter", "Authenticated user cache misses.", principal_cache.misses),
+        "game_session_batches_total": ("counter", "Write-behind batches flushed.", writer["batches"]),
+        "game_session_batch_rows_total": ("counter", "Rows written by write-behind batches.", writer["rows"]),
+        "game_session_flush_seconds_total": ("counter", "Total write-behind flush time.", writer["flush_seconds_total"])
     }
+    if pool["initialized"]:
+        gauges.update({
+            "db_pool_size": ("gauge", "Configured connection pool size.", pool["size"]),
+            "db_pool_checked_out": ("gauge", "Connections currently checked out.", pool["checked_out"]),
+            "db_pool_overflow": ("gauge", "Overflow connections in use.", pool["overflow"]),
+            "db_pool_checkout_wait_seconds_total": ("counter", "Total time spent waiting for a connection.", pool["wait_seconds_total"]),
+            "db_pool_checkout_timeouts_total": ("counter", "Checkouts that timed out.", pool["timeouts"])
+        })
+    return Response(render_prometheus(gauges), media_type="text/plain; version=0.0.4")
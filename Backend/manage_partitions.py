@@ -0,0 +1,92 @@
+"""
+Manage monthly partitions of game_sessions (PostgreSQL only).
+
+    python manage_partitions.py convert     # one-time: partition an existing game_sessions table
+    python manage_partitions.py ensure      # create the current and upcoming months
+    python manage_partitions.py list
+    python manage_partitions.py archive [--retention-months 12] [--dry-run]
+
+archive writes each month older than the retention window to
+GAME_SESSION_ARCHIVE_DIR/game_sessions_YYYY_MM.ndjson.gz, then detaches and
+drops its partition. /api/game/export keeps reading archived months from
+those files. Rollup tables (user_game_stats, user_daily_scores) are not
+touched, so progress and leaderboards keep archived games; do not run
+backfill_user_game_stats.py after archiving, as it only sees the table.
+"""
+import argparse
+import sys
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.partitions import (
+    archivable_months,
+    archive_partition,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_name
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of game_sessions")
+    parser.add_argument("command", choices=["convert", "ensure", "list", "archive"])
+    parser.add_argument("--ahead", type=int, default=settings.GAME_SESSION_PARTITIONS_AHEAD,
+                        help="Upcoming months to create (convert, ensure)")
+    parser.add_argument("--retention-months", type=int, default=settings.GAME_SESSION_RETENTION_MONTHS,
+                        help="Months kept in the database (archive)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what archive would move")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print("❌ Partitioning requires PostgreSQL")
+        sys.exit(1)
+
+    with engine.begin() as conn:
+        partitioned = is_partitioned(conn)
+
+    if args.command == "convert":
+        if partitioned:
+            print("game_sessions is already partitioned")
+            return
+        print("Converting game_sessions to monthly partitions...")
+        with engine.begin() as conn:
+            copied = convert_to_partitioned(conn, args.ahead)
+            months = list_partitions(conn)
+        print(f"✅ Copied {copied} rows into {len(months)} monthly partitions")
+        return
+
+    if not partitioned:
+        print("❌ game_sessions is not partitioned; run `python manage_partitions.py convert` first")
+        sys.exit(1)
+
+    if args.command == "ensure":
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, args.ahead)
+        print(f"✅ Created {len(created)} partition(s)")
+        for month in created:
+            print(f"   - {partition_name(month)}")
+
+    elif args.command == "list":
+        with engine.begin() as conn:
+            months = list_partitions(conn)
+        for month in months:
+            print(partition_name(month))
+
+    elif args.command == "archive":
+        with engine.begin() as conn:
+            months = archivable_months(conn, args.retention_months)
+        if not months:
+            print("Nothing to archive")
+            return
+        for month in months:
+            if args.dry_run:
+                print(f"Would archive {partition_name(month)}")
+                continue
+            # One transaction per month so a failure keeps earlier months archived
+            with engine.begin() as conn:
+                path, count = archive_partition(conn, month)
+            print(f"✅ Archived {count} rows from {partition_name(month)} to {path}")
+
+if __name__ == "__main__":
+    main()
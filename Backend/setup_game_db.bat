@@ -8,7 +8,12 @@ cd /d "%~dp0"
 
 echo [1/2] Initializing database tables...
 python init_game_tables.py
+if %ERRORLEVEL% NEQ 0 goto done
 
+echo [2/2] Backfilling game statistics...
+python backfill_user_game_stats.py
+
+:done
 if %ERRORLEVEL% EQU 0 (
     echo.
     echo ====================================